@@ -5,6 +5,11 @@ TIME_PER_REEL = 3.6
 TIME_PER_REEL_DEVIATION = 3.7
 DAYDREAMING_THRESHOLD = 120
 SLACKING_THRESHOLD = 120 #  Time spent on illegal window / app
+SLACK_ACTION_COOLDOWN = 5 #  While a slack verdict stays true, react again this long after the last reaction
 
 SLACKING_APPS = ["discord", "roblox", "genshin impact"]
-SLACKING_TITLE_KEYWORDS = ["youtube", "twitch", "reddit", "instagram", "x"]
\ No newline at end of file
+SLACKING_TITLE_KEYWORDS = ["youtube", "twitch", "reddit", "instagram", "x"]
+SLACKING_WHOLE_WORD_KEYWORDS = ["x"] #  Only match as a separate word, e.g. "Home / X" but not "Firefox"
+
+INPUT_TRACE_PATH = None #  e.g. "session.nbt": record input/window events for `python -m slack_detection.trace replay`
+SPRITE_ATLAS_CACHE = True #  Keep the decoded sprites in one raw atlas file in the user cache dir for fast starts
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 import platform
-import re
-import time
 import math
 import random
 import subprocess
-from typing import Optional, Sequence, Tuple, Union
+from typing import Callable, Optional, Sequence, Tuple, Union
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
@@ -15,25 +14,36 @@ from CONFIG import *
 from hamster_states import HamsterState
 from hamster_dabrain import enter_state
 from slack_detection import get_active_window_info
-from utils import play_audio, _parse_xprop_value, _run_command, _macos_accessibility_trusted
+from utils import play_audio, _macos_accessibility_trusted
+from slack_detection.latency import get_latency_tracker
+from slack_detection.matcher import get_slacking_matcher
+from slack_detection.x11 import move_resize_window
+from sprite_cache import region_from_alpha
+from timeline import Ticker, Tween, ease_out_cubic, linear
+from window_geometry import WindowGeometryWatcher
+from window_probe import get_window_probe, request_active_window
+from window_registry import WindowInfo, get_window_registry
 
 
 SizeLike = Union[QtCore.QSize, Tuple[int, int]]
 
 
-@dataclass
-class WindowInfo:
-    window_id: str
-    title: str
-    app_name: Optional[str]
-    rect: QtCore.QRect
-
-
 @dataclass
 class BiteSession:
     overlay: "BiteOverlay"
-    timer: QtCore.QTimer
+    timer: Ticker
     window_id: str
+    geometry_watcher: Optional[WindowGeometryWatcher] = None
+
+
+@dataclass(frozen=True)
+class BiteShape:
+    """Bite for one rect size, built around (0, 0); translate by the bite rect's top-left to use it."""
+
+    path: QtGui.QPainterPath
+    pixmap: QtGui.QPixmap  # the filled path, drawn at `offset`
+    offset: QtCore.QPoint
+    region: QtGui.QRegion  # every pixel of `pixmap` with alpha, for setMask
 
 
 @dataclass
@@ -44,6 +54,9 @@ class SplatState:
     prev_scale: float
     prev_ham_pos: Tuple[float, float]
     event_filter: QtCore.QObject
+    #  Full-window splat render and what it was rendered for (screen, DPR, size, sprite, pose)
+    frame: Optional[QtGui.QPixmap] = None
+    frame_key: Optional[tuple] = None
 
 
 class BiteOverlay(QtWidgets.QWidget):
@@ -65,23 +78,30 @@ class BiteOverlay(QtWidgets.QWidget):
         self.setWindowFlag(QtCore.Qt.WindowDoesNotAcceptFocus, True)
         self.setFocusPolicy(QtCore.Qt.NoFocus)
         self._bite_rect = QtCore.QRect()
-        self._bite_color = QtGui.QColor(0, 0, 0, 255)
+        self._bite_shape: Optional[BiteShape] = None
 
     def update_target_window(self, window: WindowInfo) -> None:
         rect = window.rect
         if rect.width() <= 0 or rect.height() <= 0:
             return
+        bite_rect = _bite_rect_for_window(window)
+        if rect == self.geometry() and bite_rect == self._bite_rect:
+            return
         self.setGeometry(rect)
-        self._bite_rect = _bite_rect_for_window(window)
+        if bite_rect.size() != self._bite_rect.size() or self._bite_shape is None:
+            self._bite_shape = _bite_shape(bite_rect.width(), bite_rect.height(), self.devicePixelRatioF())
+        if bite_rect != self._bite_rect:
+            self._bite_rect = bite_rect
+            #  Only the bite is part of the window, so the compositor blends nothing else
+            self.setMask(self._bite_shape.region.translated(bite_rect.topLeft()))
         self.update()
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
-        if self._bite_rect.isNull():
+        if self._bite_rect.isNull() or self._bite_shape is None:
             return
         painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
-        path = _build_bite_path(self._bite_rect)
-        painter.fillPath(path, self._bite_color)
+        painter.drawPixmap(self._bite_rect.topLeft() + self._bite_shape.offset, self._bite_shape.pixmap)
+        get_latency_tracker().visible("bite")
 
 
 class _SplatResetFilter(QtCore.QObject):
@@ -120,13 +140,33 @@ def bite( #  Should only be run if active window is slacking window
     hamster_widget: QtWidgets.QWidget,
     poll_interval_ms: int = 20,
 ) -> Optional[BiteSession]:
-    """Overlay a bite mask over a slacking browser window until the tab changes."""
+    """Overlay a bite mask over a slacking browser window until the tab changes.
+
+    The window lookup runs on the window probe, so the bite starts once it answers.
+    Returns the running session, or None while the lookup is pending.
+    """
+    existing = getattr(hamster_widget, "_bite_session", None)
+    if existing is not None and existing.timer.isActive():
+        get_latency_tracker().visible("bite")
+        return existing
+    _request_slacking_window(
+        SLACKING_TITLE_KEYWORDS,
+        lambda window: _start_bite(hamster_widget, window, poll_interval_ms),
+    )
+    return None
+
+
+def _start_bite(
+    hamster_widget: QtWidgets.QWidget,
+    window: Optional[WindowInfo],
+    poll_interval_ms: int,
+) -> Optional[BiteSession]:
     existing = getattr(hamster_widget, "_bite_session", None)
     if existing is not None and existing.timer.isActive():
         return existing
-    window = _find_slacking_window(SLACKING_TITLE_KEYWORDS)
     if window is None:
         print("bite: Couldn't find window")
+        get_latency_tracker().cancel("bite")
         return None
 
     print("bite: trying bite overlay")
@@ -141,38 +181,65 @@ def bite( #  Should only be run if active window is slacking window
     hamster_widget.raise_()
     print("bite: overlay")
 
-    timer = QtCore.QTimer(overlay)
-    timer.setInterval(max(20, int(poll_interval_ms)))
+    #  Follow the bitten window through X events; other platforms poll the registry.
+    watcher: Optional[WindowGeometryWatcher] = WindowGeometryWatcher(window.window_id)
+    if watcher.start():
+        def follow(rect: QtCore.QRect) -> None:
+            get_window_registry().update_rect(window.window_id, rect)
+            overlay.update_target_window(replace(window, rect=rect))
+
+        watcher.geometry_changed.connect(follow)
+        watcher.window_closed.connect(lambda: _end_bite(hamster_widget))
+    else:
+        watcher = None
 
     def tick() -> None:
-        active_app, active_title = get_active_window_info()
+        active_app, active_title = _latest_active_window(hamster_widget)
         active_title_norm = (active_title or "").casefold()
         active_is_hamster = active_title_norm == "nibbles"
         if (active_app or active_title) and not active_is_hamster and not _is_slacking_window(
             active_app, active_title, SLACKING_TITLE_KEYWORDS
         ):
-            timer.stop()
-            hamster_widget.move_to_bottom_right()
-            hamster_widget.rotate(-20)
-            hamster_widget.flip_direction()
-            _set_ham_state(hamster_widget, HamsterState.IDLE)
-            overlay.close()
-            overlay.deleteLater()
-            setattr(hamster_widget, "_bite_session", None)
+            _end_bite(hamster_widget)
             return
-        updated = _find_window_by_id(window.window_id)
+        if watcher is not None:
+            return
+        updated = _latest_window(window.window_id)
         if updated is None:
             return
         overlay.update_target_window(updated)
 
-    timer.timeout.connect(tick)
+    timer = Ticker(tick, max(20, int(poll_interval_ms)))
     timer.start()
 
-    session = BiteSession(overlay=overlay, timer=timer, window_id=window.window_id)
+    session = BiteSession(
+        overlay=overlay,
+        timer=timer,
+        window_id=window.window_id,
+        geometry_watcher=watcher,
+    )
     setattr(hamster_widget, "_bite_session", session)
     return session
 
 
+def _end_bite(hamster_widget: QtWidgets.QWidget) -> None:
+    session = getattr(hamster_widget, "_bite_session", None)
+    if session is None:
+        return
+    session.timer.stop()
+    if session.geometry_watcher is not None:
+        #  Joins the watcher thread, so it cannot emit once the overlay is deleted
+        session.geometry_watcher.stop()
+        session.geometry_watcher.deleteLater()
+    hamster_widget.move_to_bottom_right()
+    hamster_widget.rotate(-20)
+    hamster_widget.flip_direction()
+    _set_ham_state(hamster_widget, HamsterState.IDLE)
+    session.overlay.close()
+    session.overlay.deleteLater()
+    setattr(hamster_widget, "_bite_session", None)
+
+
 def make_window_smaller( #  Can only be used if active window is slacking.
     hamster_widget: QtWidgets.QWidget,
     shrink_by: SizeLike = (160, 120),
@@ -180,18 +247,41 @@ def make_window_smaller( #  Can only be used if active window is slacking.
     interval_ms: int = 8,
     min_size: Optional[SizeLike] = None,
     duration_ms: Optional[int] = 240,
-) -> Optional[QtCore.QTimer]:
-    """Gradually shrink the slacking window from bottom-right while anchoring hamster there."""
+) -> Optional[Tween]:
+    """Gradually shrink the slacking window from bottom-right while anchoring hamster there.
+
+    The returned tween starts once the window probe has found the slacking window.
+    """
     if not _macos_accessibility_trusted():
         print(
             "make_window_smaller: Accessibility permission not granted for this process."
         )
+        get_latency_tracker().cancel("make_window_smaller")
         return None
 
-    window = _find_slacking_window(SLACKING_TITLE_KEYWORDS)
+    timer = Tween(easing=ease_out_cubic, hold=True, interval_ms=max(1, int(interval_ms)))
+    _request_slacking_window(
+        SLACKING_TITLE_KEYWORDS,
+        lambda window: _start_shrink(
+            hamster_widget, timer, window, shrink_by, step_px, min_size, duration_ms
+        ),
+    )
+    return timer
+
+
+def _start_shrink(
+    hamster_widget: QtWidgets.QWidget,
+    timer: Tween,
+    window: Optional[WindowInfo],
+    shrink_by: SizeLike,
+    step_px: int,
+    min_size: Optional[SizeLike],
+    duration_ms: Optional[int],
+) -> None:
     if window is None:
         print("make_window_smaller: Couldn't find slacking window")
-        return None
+        get_latency_tracker().cancel("make_window_smaller")
+        return
 
     shrink_size = _to_size(shrink_by)
     minimum_size = _to_size(min_size) if min_size is not None else QtCore.QSize(240, 180)
@@ -201,32 +291,53 @@ def make_window_smaller( #  Can only be used if active window is slacking.
     target_height = max(minimum_size.height(), current_size.height() - max(0, shrink_size.height()))
     target_size = QtCore.QSize(target_width, target_height)
     start_rect = window.rect
-    start_width = start_rect.width()
-    start_height = start_rect.height()
-    duration_s = (duration_ms or 0) / 1000.0
+    timer.start_value = (float(start_rect.width()), float(start_rect.height()))
+    timer.end_value = (float(target_width), float(target_height))
+    if duration_ms:
+        timer.duration_s = duration_ms / 1000.0
+    else:
+        #  No duration: shrink linearly by step_px per interval
+        step = max(1, int(step_px))
+        steps = max(current_size.width() - target_width, current_size.height() - target_height) / step
+        timer.duration_s = max(0.0, steps) * timer.interval() / 1000.0
+        timer.easing = linear
 
-    step = max(1, int(step_px))
     _position_hamster_bottom_right_rect(hamster_widget, window.rect)
 
-    timer = QtCore.QTimer(hamster_widget)
-    timer.setInterval(max(1, int(interval_ms)))
-    start_time = time.time()
     shrink_complete = False
 
+    def on_resized(resized: bool) -> None:
+        if resized:
+            get_latency_tracker().visible("make_window_smaller")
+            return
+        if not timer.isActive():
+            return
+        get_latency_tracker().cancel("make_window_smaller")
+        print(
+            "make_window_smaller: Failed to resize window. "
+            "On macOS this requires Accessibility permission."
+        )
+        timer.stop()
+
+    def on_reverted(resized: bool) -> None:
+        if not resized:
+            print("make_window_smaller: revert failed")
+
     def revert() -> None:
-        updated = _find_window_by_id(window.window_id)
+        updated = _latest_window(window.window_id)
         target = updated or window
-        if not _set_window_rect(target, start_rect):
-            print("make_window_smaller: revert failed")
+        _request_window_rect(target, start_rect, on_reverted)
         hamster_widget.move_to_bottom_right()
 
-    def tick() -> None:
-        active_app, active_title = get_active_window_info()
-        if not _is_slacking_window(active_app, active_title, SLACKING_TITLE_KEYWORDS):
+    def step(size: Tuple[float, float]) -> None:
+        active_app, active_title = _latest_active_window(hamster_widget)
+        if (active_app or active_title) and not _is_slacking_window(
+            active_app, active_title, SLACKING_TITLE_KEYWORDS
+        ):
             revert()
             timer.stop()
             return
-        updated = _find_window_by_id(window.window_id)
+        updated = _latest_window(window.window_id)
         if updated is None or not _is_slacking_window(updated.app_name, updated.title, SLACKING_TITLE_KEYWORDS):
             revert()
             timer.stop()
@@ -234,41 +345,19 @@ def make_window_smaller( #  Can only be used if active window is slacking.
         nonlocal shrink_complete
         new_rect = None
         if not shrink_complete:
-            if duration_s > 0:
-                elapsed = time.time() - start_time
-                t = min(1.0, elapsed / duration_s)
-                eased = 1.0 - (1.0 - t) ** 3
-                new_width = int(round(start_width - (start_width - target_width) * eased))
-                new_height = int(round(start_height - (start_height - target_height) * eased))
-                new_width = max(target_width, new_width)
-                new_height = max(target_height, new_height)
-                if t >= 1.0:
-                    shrink_complete = True
-            else:
-                size_now = updated.rect.size()
-                if size_now.width() <= target_size.width() and size_now.height() <= target_size.height():
-                    shrink_complete = True
-                else:
-                    new_width = max(target_size.width(), size_now.width() - step)
-                    new_height = max(target_size.height(), size_now.height() - step)
-            if shrink_complete:
-                new_rect = QtCore.QRect(updated.rect.topLeft(), target_size)
-            else:
-                new_rect = QtCore.QRect(updated.rect.topLeft(), QtCore.QSize(new_width, new_height))
-            if not _set_window_rect(updated, new_rect):
-                print(
-                    "make_window_smaller: Failed to resize window. "
-                    "On macOS this requires Accessibility permission."
-                )
-                timer.stop()
-                return
-        refreshed = _find_window_by_id(window.window_id)
-        anchor_rect = refreshed.rect if refreshed is not None else (new_rect or updated.rect)
+            #  The tween holds at the target size once done; send that size once, then just follow
+            shrink_complete = timer.progress >= 1.0
+            new_size = QtCore.QSize(
+                max(target_width, int(round(size[0]))),
+                max(target_height, int(round(size[1]))),
+            )
+            new_rect = QtCore.QRect(updated.rect.topLeft(), target_size if shrink_complete else new_size)
+            _request_window_rect(updated, new_rect, on_resized)
+        anchor_rect = new_rect or updated.rect
         _position_hamster_bottom_right_rect(hamster_widget, anchor_rect)
 
-    timer.timeout.connect(tick)
+    timer.apply = step
     timer.start()
-    return timer
 
 
 def splat(hamster_widget: QtWidgets.QWidget) -> Optional[SplatState]:
@@ -280,6 +369,7 @@ def splat(hamster_widget: QtWidgets.QWidget) -> Optional[SplatState]:
     ham = getattr(hamster_widget, "ham", None)
     if ham is None or not hasattr(ham, "user_scale"):
         print("splat: hamster widget missing model")
+        get_latency_tracker().cancel("splat")
         return None
     _set_ham_state(hamster_widget, HamsterState.SPLAT)
 
@@ -291,12 +381,14 @@ def splat(hamster_widget: QtWidgets.QWidget) -> Optional[SplatState]:
         sx, sy = 1.0, 1.0
     if pm is None or pm.isNull():
         print("splat: missing pixmap")
+        get_latency_tracker().cancel("splat")
         return None
 
     center = hamster_widget.frameGeometry().center()
     screen = QtGui.QGuiApplication.screenAt(center) or QtGui.QGuiApplication.primaryScreen()
     if screen is None:
         print("splat: no screen available")
+        get_latency_tracker().cancel("splat")
         return None
 
     prev_geometry = hamster_widget.geometry()
@@ -323,6 +415,10 @@ def splat(hamster_widget: QtWidgets.QWidget) -> Optional[SplatState]:
     hamster_widget.setMaximumSize(screen_size)
     hamster_widget.resize(screen_size)
     hamster_widget.move(screen_rect.topLeft())
+    #  The window may be shaped to the idle sprite; the splat covers the whole screen.
+    #  Forget the fit too, so the shape is rebuilt once the splat is reset
+    hamster_widget.clearMask()
+    hamster_widget._fitted_signature = None
 
     base_w = max(1, pm.width())
     base_h = max(1, pm.height())
@@ -340,11 +436,68 @@ def splat(hamster_widget: QtWidgets.QWidget) -> Optional[SplatState]:
     return state
 
 
+def splat_frame(hamster_widget: QtWidgets.QWidget) -> Optional[QtGui.QPixmap]:
+    """The whole splat window as one pixmap, rendered once per screen, DPR and pose.
+
+    Upscaling the splat sprite to a 4K window is expensive, so it happens once
+    here; every later paint (expose, raise) is a plain blit of the result.
+    """
+    state = getattr(hamster_widget, "_splat_state", None)
+    ham = getattr(hamster_widget, "ham", None)
+    get_pm = getattr(hamster_widget, "_current_pixmap_and_squash", None)
+    if state is None or ham is None or not callable(get_pm):
+        return None
+    pm, sx, sy = get_pm()
+    if pm is None or pm.isNull():
+        return None
+
+    screen = QtGui.QGuiApplication.screenAt(hamster_widget.frameGeometry().center())
+    dpr = hamster_widget.devicePixelRatioF()
+    size = hamster_widget.size()
+    rotation_deg = float(getattr(hamster_widget, "_rotation_deg", 0.0))
+    flip_x = bool(getattr(hamster_widget, "_flip_x", False))
+    key = (
+        screen.name() if screen is not None else None,
+        dpr,
+        size.width(),
+        size.height(),
+        pm.cacheKey(),
+        float(ham.user_scale),
+        float(sx),
+        float(sy),
+        float(ham.x),
+        float(ham.y),
+        rotation_deg,
+        flip_x,
+    )
+    if state.frame is not None and state.frame_key == key:
+        return state.frame
+
+    frame = QtGui.QPixmap(max(1, int(math.ceil(size.width() * dpr))), max(1, int(math.ceil(size.height() * dpr))))
+    frame.setDevicePixelRatio(dpr)
+    frame.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(frame)
+    painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
+    painter.translate(ham.x, ham.y)
+    painter.rotate(rotation_deg)
+    if flip_x:
+        painter.scale(-1, 1)
+    width = pm.width() * ham.user_scale * sx
+    height = pm.height() * ham.user_scale * sy
+    painter.drawPixmap(QtCore.QRectF(-width / 2, -height / 2, width, height), pm, QtCore.QRectF(pm.rect()))
+    painter.end()
+    state.frame = frame
+    state.frame_key = key
+    return frame
+
+
 def _reset_splat(hamster_widget: QtWidgets.QWidget) -> None:
     state = getattr(hamster_widget, "_splat_state", None)
     if state is None:
         return
 
+    state.frame = None
+    state.frame_key = None
     hamster_widget.removeEventFilter(state.event_filter)
     state.event_filter.deleteLater()
 
@@ -359,6 +512,8 @@ def _reset_splat(hamster_widget: QtWidgets.QWidget) -> None:
         enter_state(ham, HamsterState.IDLE)
 
     setattr(hamster_widget, "_splat_state", None)
+    #  Same sprite and position as before the splat, but the mask is gone: fit again
+    hamster_widget._fitted_signature = None
     hamster_widget.update()
 
 
@@ -378,10 +533,8 @@ def slap_cursor(
     moves: int = 6,
     interval_ms: int = 45,
     distance_px: int = 220,
-) -> QtCore.QTimer:
+) -> Ticker:
     """Jolt the mouse cursor around to 'slap' it away from where it currently is."""
-    timer = QtCore.QTimer(hamster_widget)
-    timer.setInterval(max(1, int(interval_ms)))
     remaining = max(1, int(moves))
 
     def clamp_to_screen(point: QtCore.QPoint, screen: Optional[QtGui.QScreen]) -> QtCore.QPoint:
@@ -408,10 +561,11 @@ def slap_cursor(
         screen = QtGui.QGuiApplication.screenAt(cursor_pos) or QtGui.QGuiApplication.primaryScreen()
         QtGui.QCursor.setPos(clamp_to_screen(target, screen))
 
-    timer.timeout.connect(tick)
+    timer = Ticker(tick, max(1, int(interval_ms)))
     play_audio("sound_effects/slap.mp3")
     """"to add: move nibbles to mouse pos and change sprite to hold mouse"""
     tick()  # fire once immediately
+    get_latency_tracker().visible("slap_cursor")
     timer.start()
     return timer
 
@@ -423,15 +577,12 @@ def _to_size(value: SizeLike) -> QtCore.QSize:
 def drag(
     hamster_widget: QtWidgets.QWidget,
     poll_interval_ms: int = 16,
-) -> QtCore.QTimer:
-    timer = QtCore.QTimer(hamster_widget)
-    timer.setInterval(max(1, int(poll_interval_ms)))
-
+) -> Ticker:
     def tick() -> None:
         pos = QtGui.QCursor.pos()
         hamster_widget.move(pos.x(), pos.y())
 
-    timer.timeout.connect(tick)
+    timer = Ticker(tick, max(1, int(poll_interval_ms)))
     timer.start()
     return timer
 
@@ -545,12 +696,28 @@ def _build_bite_path(rect: QtCore.QRect) -> QtGui.QPainterPath:
     return transform.map(path)
 
 
+@lru_cache(maxsize=8)
+def _bite_shape(width: int, height: int, device_pixel_ratio: float = 1.0) -> BiteShape:
+    """_build_bite_path for a width x height rect, rendered once to an antialiased pixmap and mask."""
+    path = _build_bite_path(QtCore.QRect(0, 0, width, height))
+    bounds = path.boundingRect().toAlignedRect()
+    pixmap = QtGui.QPixmap(
+        max(1, int(math.ceil(bounds.width() * device_pixel_ratio))),
+        max(1, int(math.ceil(bounds.height() * device_pixel_ratio))),
+    )
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    pixmap.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(pixmap)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+    painter.translate(-bounds.x(), -bounds.y())
+    painter.fillPath(path, QtGui.QColor(0, 0, 0, 255))
+    painter.end()
+    offset = bounds.topLeft()
+    return BiteShape(path, pixmap, offset, region_from_alpha(pixmap).translated(offset))
+
+
 def _title_matches_slacking(window_title: Optional[str], keywords: Sequence[str]) -> bool:
-    title = (window_title or "").casefold()
-    for keyword in keywords:
-        if keyword and keyword.casefold() in title:
-            return True
-    return False
+    return get_slacking_matcher(keywords).title_matches(window_title)
 
 
 def _is_slacking_window(
@@ -558,11 +725,7 @@ def _is_slacking_window(
     window_title: Optional[str],
     title_keywords: Sequence[str],
 ) -> bool:
-    app = (app_name or "").casefold()
-    for keyword in SLACKING_APPS:
-        if keyword and keyword.casefold() in app:
-            return True
-    return _title_matches_slacking(window_title, title_keywords)
+    return get_slacking_matcher(title_keywords).matches(app_name, window_title)
 
 
 def _score_active_window_match(
@@ -589,7 +752,8 @@ def _score_active_window_match(
 
 
 def _find_slacking_window(keywords: Sequence[str]) -> Optional[WindowInfo]:
-    windows = _list_windows()
+    registry = get_window_registry()
+    windows = registry.windows()
     if not windows:
         return None
 
@@ -597,7 +761,8 @@ def _find_slacking_window(keywords: Sequence[str]) -> Optional[WindowInfo]:
     if _is_slacking_window(active_app, active_title, keywords):
         best = None
         best_score = 0
-        for window in windows:
+        #  Only windows of the active app can be the active window; fall back to a full scan.
+        for window in registry.by_app(active_app) or windows:
             score = _score_active_window_match(window, active_app, active_title)
             if score > best_score:
                 best = window
@@ -620,257 +785,67 @@ def _find_slacking_window(keywords: Sequence[str]) -> Optional[WindowInfo]:
 
 
 def _find_window_by_id(window_id: str) -> Optional[WindowInfo]:
-    for window in _list_windows():
-        if window.window_id == window_id:
-            return window
-    return None
-
+    return get_window_registry().get(window_id)
 
-def _list_windows() -> list[WindowInfo]:
-    system = platform.system().lower()
-    if system == "windows":
-        return _list_windows_windows()
-    if system == "darwin":
-        return _list_windows_macos()
-    return _list_windows_linux()
-
-
-def _list_windows_windows() -> list[WindowInfo]:
-    try:
-        import ctypes
-        from ctypes import wintypes
-    except Exception:
-        return []
 
-    user32 = ctypes.WinDLL("user32", use_last_error=True)
-    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
-    windows: list[WindowInfo] = []
-
-    EnumWindowsProc = ctypes.WINFUNCTYPE(
-        wintypes.BOOL, wintypes.HWND, wintypes.LPARAM
+def _request_slacking_window(
+    keywords: Sequence[str],
+    callback: Callable[[Optional[WindowInfo]], None],
+) -> None:
+    keywords = tuple(keywords)
+    get_window_probe().request(
+        ("slacking_window", keywords),
+        lambda: _find_slacking_window(keywords),
+        callback,
+        remember=False,
     )
 
-    def enum_callback(hwnd: wintypes.HWND, _lparam: wintypes.LPARAM) -> wintypes.BOOL:
-        if not user32.IsWindowVisible(hwnd) or user32.IsIconic(hwnd):
-            return True
-        length = user32.GetWindowTextLengthW(hwnd)
-        if length == 0:
-            return True
-        buffer = ctypes.create_unicode_buffer(length + 1)
-        user32.GetWindowTextW(hwnd, buffer, length + 1)
-        title = buffer.value
-        if not title:
-            return True
-        rect = wintypes.RECT()
-        if not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
-            return True
-        width = rect.right - rect.left
-        height = rect.bottom - rect.top
-        if width <= 0 or height <= 0:
-            return True
-
-        process_id = wintypes.DWORD()
-        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(process_id))
-        handle = kernel32.OpenProcess(0x1000, False, process_id.value)
-        app_name = None
-        if handle:
-            try:
-                size = wintypes.DWORD(1024)
-                exe_buffer = ctypes.create_unicode_buffer(size.value)
-                if kernel32.QueryFullProcessImageNameW(
-                    handle, 0, exe_buffer, ctypes.byref(size)
-                ):
-                    app_name = exe_buffer.value.split("\\")[-1]
-            finally:
-                kernel32.CloseHandle(handle)
-
-        qt_rect = QtCore.QRect(rect.left, rect.top, width, height)
-        windows.append(
-            WindowInfo(
-                window_id=str(hwnd),
-                title=title,
-                app_name=app_name,
-                rect=qt_rect,
-            )
-        )
-        return True
-
-    user32.EnumWindows(EnumWindowsProc(enum_callback), 0)
-    return windows
-
 
-def _list_windows_macos() -> list[WindowInfo]:
-    quartz_windows = _list_windows_macos_quartz()
-    if quartz_windows:
-        return quartz_windows
-
-    script = (
-        'tell application "System Events"\n'
-        "set appList to application processes whose visible is true\n"
-        'set output to ""\n'
-        "repeat with proc in appList\n"
-        "set appName to name of proc\n"
-        "repeat with w in windows of proc\n"
-        "set windowName to name of w\n"
-        "set windowId to id of w\n"
-        "set winPos to position of w\n"
-        "set winSize to size of w\n"
-        'set output to output & windowId & "||" & appName & "||" & windowName & '
-        '"||" & item 1 of winPos & "," & item 2 of winPos & "," & '
-        'item 1 of winSize & "," & item 2 of winSize & "\\n"\n'
-        "end repeat\n"
-        "end repeat\n"
-        "return output\n"
-        "end tell"
+def _request_window_rect(
+    window: WindowInfo,
+    rect: QtCore.QRect,
+    callback: Optional[Callable[[bool], None]] = None,
+) -> None:
+    target = QtCore.QRect(rect)
+    #  Frame-coalesced: if the previous resize is still pending only the newest target is sent.
+    get_window_probe().request_latest(
+        ("set_window_rect", window.window_id),
+        lambda: _set_window_rect(window, target),
+        callback,
     )
-    result = _run_command(["osascript", "-e", script])
-    if not result:
-        return []
-    windows: list[WindowInfo] = []
-    for line in result.splitlines():
-        parts = line.split("||")
-        if len(parts) != 4:
-            continue
-        window_id, app_name, title, rect_csv = parts
-        rect_parts = rect_csv.split(",")
-        if len(rect_parts) != 4:
-            continue
-        try:
-            x, y, width, height = (int(val) for val in rect_parts)
-        except ValueError:
-            continue
-        if width <= 0 or height <= 0:
-            continue
-        windows.append(
-            WindowInfo(
-                window_id=str(window_id),
-                title=title,
-                app_name=app_name or None,
-                rect=QtCore.QRect(x, y, width, height),
-            )
-        )
-    return windows
 
 
-def _list_windows_macos_quartz() -> list[WindowInfo]:
-    try:
-        import Quartz  # type: ignore
-    except Exception:
-        return []
-
-    options = Quartz.kCGWindowListOptionOnScreenOnly
-    window_list = Quartz.CGWindowListCopyWindowInfo(options, Quartz.kCGNullWindowID)
-    if not window_list:
-        return []
-
-    windows: list[WindowInfo] = []
-    for window in window_list:
-        bounds = window.get("kCGWindowBounds")
-        if not bounds:
-            continue
-        width = int(bounds.get("Width", 0))
-        height = int(bounds.get("Height", 0))
-        if width <= 0 or height <= 0:
-            continue
-        title = window.get("kCGWindowName") or ""
-        app_name = window.get("kCGWindowOwnerName") or None
-        window_id = window.get("kCGWindowNumber")
-        if window_id is None:
-            continue
-        rect = _qt_rect_from_cg_bounds(bounds, width, height)
-        windows.append(
-            WindowInfo(
-                window_id=str(window_id),
-                title=title,
-                app_name=app_name,
-                rect=rect,
-            )
-        )
-    return windows
+def _latest_window(window_id: str) -> Optional[WindowInfo]:
+    """Last known geometry of window_id; a stale registry is refreshed on the probe thread."""
+    registry = get_window_registry()
+    if registry.is_stale():
+        get_window_probe().request("window_registry", registry.snapshot, remember=False)
+    return registry.peek(window_id)
 
 
-def _qt_rect_from_cg_bounds(
-    bounds: dict,
-    width: int,
-    height: int,
-) -> QtCore.QRect:
-    x = int(bounds.get("X", 0))
-    y = int(bounds.get("Y", 0))
-    y = _macos_flip_y(y, height)
-    return QtCore.QRect(x, y, width, height)
-
-
-def _macos_flip_y(y: int, height: int) -> int:
-    app = QtWidgets.QApplication.instance()
-    if app is None:
-        return y
-    screen = app.primaryScreen()
-    if screen is None:
-        return y
-    geo = screen.geometry()
-    return geo.y() + geo.height() - (y + height)
-
-
-def _list_windows_linux() -> list[WindowInfo]:
-    root_output = _run_command(["xprop", "-root", "_NET_CLIENT_LIST"])
-    if not root_output:
-        return []
-    ids = re.findall(r"0x[0-9a-fA-F]+", root_output)
-    windows: list[WindowInfo] = []
-    for window_id in ids:
-        title = _parse_xprop_value(
-            _run_command(["xprop", "-id", window_id, "_NET_WM_NAME"])
-        )
-        if title is None:
-            title = _parse_xprop_value(
-                _run_command(["xprop", "-id", window_id, "WM_NAME"])
-            )
-        if not title:
-            continue
-        app_name = _parse_xprop_value(
-            _run_command(["xprop", "-id", window_id, "WM_CLASS"]),
-            prefer_last=True,
-        )
-        rect = _xwininfo_rect(window_id)
-        if rect is None:
-            continue
-        windows.append(
-            WindowInfo(
-                window_id=window_id.lower(),
-                title=title,
-                app_name=app_name,
-                rect=rect,
-            )
-        )
-    return windows
-
-
-def _xwininfo_rect(window_id: str) -> Optional[QtCore.QRect]:
-    output = _run_command(["xwininfo", "-id", window_id])
-    if not output:
-        return None
-    x_match = re.search(r"Absolute upper-left X:\s+(-?\d+)", output)
-    y_match = re.search(r"Absolute upper-left Y:\s+(-?\d+)", output)
-    w_match = re.search(r"Width:\s+(\d+)", output)
-    h_match = re.search(r"Height:\s+(\d+)", output)
-    if not (x_match and y_match and w_match and h_match):
-        return None
-    x = int(x_match.group(1))
-    y = int(y_match.group(1))
-    width = int(w_match.group(1))
-    height = int(h_match.group(1))
-    if width <= 0 or height <= 0:
-        return None
-    return QtCore.QRect(x, y, width, height)
+def _latest_active_window(
+    hamster_widget: QtWidgets.QWidget,
+) -> Tuple[Optional[str], Optional[str]]:
+    state = getattr(hamster_widget, "slack_state", None)
+    watched = getattr(state, "watched_active_window", None)
+    if watched is not None:
+        return watched[0], watched[1]
+    return request_active_window()
 
 
 def _set_window_rect(window: WindowInfo, rect: QtCore.QRect) -> bool:
     system = platform.system().lower()
     if system == "darwin":
-        return _set_window_rect_macos(window, rect)
-    if system == "windows":
-        return False
-    return False
+        resized = _set_window_rect_macos(window, rect)
+    elif system == "windows":
+        resized = False
+    else:
+        resized = move_resize_window(
+            window.window_id, rect.x(), rect.y(), rect.width(), rect.height()
+        )
+    if resized:
+        get_window_registry().update_rect(window.window_id, rect)
+    return resized
 
 
 def _set_window_rect_macos(window: WindowInfo, rect: QtCore.QRect) -> bool:
@@ -0,0 +1,301 @@
+"""Benchmarks for slack detection hot paths.
+
+Run from the repo root:
+    python -m benchmarks.bench_detection --json results.json
+    python -m benchmarks.bench_detection --compare results.json  # exit 1 on regression
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from PyQt5 import QtCore
+
+from CONFIG import *
+import annoyed_actions
+import window_registry
+from slack_detection import SlackDetectionState, _is_periodic
+from slack_detection.detection import (
+    detect_active_slacking_window,
+    detect_any_slacking_window,
+    detect_inactivity,
+    detect_scrolling,
+    is_slacking_window,
+)
+from slack_detection.input_recording import (
+    record_keypress,
+    record_mouse_click,
+    record_mouse_move,
+    record_mouse_scroll,
+)
+from slack_detection.ring_buffer import TimestampRing
+from utils import _parse_xprop_value
+from window_registry import WindowInfo, WindowRegistry
+
+from benchmarks import workloads
+
+_RECORDERS = {
+    "click": record_mouse_click,
+    "scroll": record_mouse_scroll,
+    "key": record_keypress,
+    "move": record_mouse_move,
+}
+_PERIODIC_ARGS = (REELS_SCROLLED, 0.62, TIME_PER_REEL + TIME_PER_REEL_DEVIATION, 1)
+
+
+class Samples:
+    """Per-call latencies (perf_counter_ns) of one benchmark."""
+
+    def __init__(self) -> None:
+        self.ns: list[int] = []
+
+    def time(self, fn: Callable[..., object], *args, **kwargs) -> None:
+        start = time.perf_counter_ns()
+        fn(*args, **kwargs)
+        self.ns.append(time.perf_counter_ns() - start)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.ns)
+        total = sum(ordered)
+
+        def percentile(q: float) -> int:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {
+            "calls": len(ordered),
+            "ops_per_sec": round(len(ordered) / (total / 1e9), 1) if total else 0.0,
+            "mean_ns": round(total / len(ordered), 1),
+            "p50_ns": percentile(0.50),
+            "p99_ns": percentile(0.99),
+        }
+
+
+def bench_is_periodic(samples: Samples, events: list[workloads.InputEvent]) -> None:
+    ring = TimestampRing(120)
+    for kind, timestamp in events:
+        if kind in ("click", "scroll"):
+            ring.append(timestamp)
+            samples.time(_is_periodic, ring, *_PERIODIC_ARGS)
+
+
+def bench_is_periodic_seconds(samples: Samples, events: list[workloads.InputEvent]) -> None:
+    seconds = [timestamp / 1e9 for kind, timestamp in events if kind in ("click", "scroll")]
+    for end in range(1, len(seconds) + 1):
+        samples.time(_is_periodic, seconds[max(0, end - 120):end], *_PERIODIC_ARGS)
+
+
+def _feed_and_time(
+    samples: Samples,
+    events: list[workloads.InputEvent],
+    window: tuple[str, str],
+    detector: Callable[..., bool],
+    **kwargs,
+) -> None:
+    state = SlackDetectionState(last_input_time=events[0][1] / 1e9)
+    state.active_window_started_at = events[0][1] / 1e9
+    for kind, timestamp in events:
+        _RECORDERS[kind](state, timestamp)
+        if detector is detect_inactivity:
+            samples.time(detector, state, now=timestamp / 1e9, **kwargs)
+        else:
+            samples.time(
+                detector,
+                state,
+                now=timestamp / 1e9,
+                active_app=window[0],
+                active_title=window[1],
+                **kwargs,
+            )
+
+
+def _active_window_for(workload: str) -> tuple[str, str]:
+    if workload == "reel_scrolling":
+        return workloads.SLACKING_WINDOWS[1]
+    return workloads.WORK_WINDOWS[0]
+
+
+def _window_infos(pairs: list[tuple[str, str]]) -> list[WindowInfo]:
+    return [
+        WindowInfo(hex(0x3a00000 + index), title, app_name, QtCore.QRect(index % 40, index % 30, 800, 600))
+        for index, (app_name, title) in enumerate(pairs)
+    ]
+
+
+def build_benchmarks(
+    input_scale: float = 1.0,
+    window_count: int = 150,
+) -> dict[str, Callable[[Samples], None]]:
+    inputs = {
+        "reel_scrolling": workloads.reel_scrolling(reels=max(1, int(400 * input_scale))),
+        "heavy_typing": workloads.heavy_typing(seconds=300.0 * input_scale),
+        "gaming": workloads.gaming(seconds=300.0 * input_scale),
+        "idle": workloads.idle(periods=max(1, int(40 * input_scale))),
+    }
+    windows = workloads.open_windows(count=window_count)
+    titles = workloads.unique_titles()
+    xprop_lines = workloads.xprop_lines()
+    slacking_app, slacking_title = workloads.SLACKING_WINDOWS[0]
+
+    benchmarks: dict[str, Callable[[Samples], None]] = {}
+    for name, events in inputs.items():
+        window = _active_window_for(name)
+        benchmarks[f"_is_periodic[{name}]"] = lambda s, e=events: bench_is_periodic(s, e)
+        benchmarks[f"_is_periodic_seconds[{name}]"] = lambda s, e=events: bench_is_periodic_seconds(s, e)
+        benchmarks[f"detect_scrolling[{name}]"] = lambda s, e=events, w=window: _feed_and_time(
+            s, e, w, detect_scrolling,
+            min_events=REELS_SCROLLED,
+            min_period_s=0.62,
+            max_period_s=TIME_PER_REEL + TIME_PER_REEL_DEVIATION,
+            max_jitter_ratio=1,
+        )
+        benchmarks[f"detect_inactivity[{name}]"] = lambda s, e=events, w=window: _feed_and_time(
+            s, e, w, detect_inactivity, idle_seconds=DAYDREAMING_THRESHOLD,
+        )
+        benchmarks[f"detect_active_slacking_window[{name}]"] = lambda s, e=events, w=window: _feed_and_time(
+            s, e, w, detect_active_slacking_window, threshold_seconds=SLACKING_THRESHOLD,
+        )
+
+    def bench_matcher(samples: Samples, pairs: list[tuple[str, str]]) -> None:
+        for app_name, title in pairs:
+            samples.time(is_slacking_window, app_name, title)
+
+    benchmarks["is_slacking_window[hot]"] = lambda s: bench_matcher(s, windows * 20)
+    benchmarks["is_slacking_window[unique]"] = lambda s: bench_matcher(s, titles)
+
+    def bench_xprop(samples: Samples) -> None:
+        for line, prefer_last in xprop_lines:
+            samples.time(_parse_xprop_value, line, prefer_last)
+
+    benchmarks["_parse_xprop_value"] = bench_xprop
+
+    def with_windows(run: Callable[[Samples], None]) -> Callable[[Samples], None]:
+        #  Serve the synthetic desktop from the shared registry instead of the real one
+        def wrapped(samples: Samples) -> None:
+            previous_registry = window_registry._registry
+            previous_lookup = annoyed_actions.get_active_window_info
+            infos = _window_infos(windows)
+            window_registry._registry = WindowRegistry(lister=lambda: infos, ttl_s=float("inf"))
+            annoyed_actions.get_active_window_info = lambda: (slacking_app, slacking_title)
+            try:
+                run(samples)
+            finally:
+                window_registry._registry = previous_registry
+                annoyed_actions.get_active_window_info = previous_lookup
+        return wrapped
+
+    def bench_any_window(samples: Samples) -> None:
+        for _ in range(500):
+            samples.time(detect_any_slacking_window)
+
+    def bench_find_window(samples: Samples) -> None:
+        for _ in range(500):
+            samples.time(annoyed_actions._find_slacking_window, SLACKING_TITLE_KEYWORDS)
+
+    benchmarks[f"detect_any_slacking_window[{window_count} windows]"] = with_windows(bench_any_window)
+    benchmarks[f"_find_slacking_window[{window_count} windows]"] = with_windows(bench_find_window)
+    return benchmarks
+
+
+def run_benchmarks(
+    benchmarks: dict[str, Callable[[Samples], None]],
+    repeat: int = 3,
+    only: Optional[str] = None,
+) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, run in benchmarks.items():
+        if only and only not in name:
+            continue
+        run(Samples())  # warm up caches and the allocator
+        samples = Samples()
+        for _ in range(repeat):
+            run(samples)
+        if samples.ns:
+            results[name] = samples.summary()
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Names and details of benchmarks whose p50 or p99 got slower than tolerance allows."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ns", "p99_ns"):
+            if previous[metric] and result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {previous[metric]} -> {result[metric]} "
+                    f"({result[metric] / previous[metric]:.2f}x)"
+                )
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except FileNotFoundError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark slack detection.")
+    parser.add_argument("--json", type=Path, help="write machine-readable results here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply input workload sizes")
+    parser.add_argument("--windows", type=int, default=150, help="open windows on the synthetic desktop")
+    parser.add_argument("--only", help="run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        build_benchmarks(input_scale=args.scale, window_count=args.windows),
+        repeat=args.repeat,
+        only=args.only,
+    )
+    width = max((len(name) for name in results), default=0)
+    print(f"{'benchmark':<{width}}  {'ops/s':>12}  {'p50 ns':>9}  {'p99 ns':>9}")
+    for name, result in results.items():
+        print(f"{name:<{width}}  {result['ops_per_sec']:>12,.0f}  {result['p50_ns']:>9}  {result['p99_ns']:>9}")
+
+    if args.json:
+        report = {
+            "revision": _git_revision(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "scale": args.scale,
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+"""Synthetic input/window workloads for the detection benchmarks.
+
+Every generator is seeded so two runs (or two versions) see identical inputs.
+Input workloads are lists of (kind, time.monotonic_ns()-style timestamp).
+"""
+from __future__ import annotations
+
+import random
+from typing import Optional
+
+from research.avg_reel_time_spent import data as REEL_SECONDS
+
+InputEvent = tuple[str, int]
+
+_START_NS = 1_000_000_000_000
+_NS = 1_000_000_000
+
+SLACKING_WINDOWS = [
+    ("firefox", "YouTube - Mozilla Firefox"),
+    ("google-chrome", "(3) Reels • Instagram - Google Chrome"),
+    ("discord", "#general | Nibbles Fan Club - Discord"),
+    ("chromium", "Home / X"),
+    ("firefox", "r/hamsters - Reddit"),
+    ("RobloxPlayerBeta", "Roblox"),
+]
+WORK_WINDOWS = [
+    ("code", "annoyed_actions.py - nibbles - Visual Studio Code"),
+    ("gnome-terminal-server", "agent@box: ~/package"),
+    ("firefox", "Python 3 documentation - Mozilla Firefox"),
+    ("libreoffice-calc", "quarterly_report.ods - LibreOffice Calc"),
+    ("thunderbird", "Inbox - Mozilla Thunderbird"),
+    ("evince", "lecture_notes.pdf"),
+    ("slack", "general (Channel) - Acme - Slack"),
+]
+
+
+def reel_scrolling(
+    reels: int = 400,
+    seed: int = 1,
+    scrolls_per_reel: int = 1,
+) -> list[InputEvent]:
+    """Scrolling short videos: time per reel sampled from the research data."""
+    rng = random.Random(seed)
+    events = []
+    now = _START_NS
+    for _ in range(reels):
+        now += int(rng.choice(REEL_SECONDS) * rng.uniform(0.9, 1.1) * _NS)
+        for burst in range(scrolls_per_reel):
+            events.append(("scroll", now + burst * 15_000_000))
+        if rng.random() < 0.3:
+            events.append(("move", now + 200_000_000))
+    return events
+
+
+def heavy_typing(seconds: float = 300.0, seed: int = 2) -> list[InputEvent]:
+    """Around 8 keys per second with pauses, occasional clicks."""
+    rng = random.Random(seed)
+    events = []
+    now = _START_NS
+    end = _START_NS + int(seconds * _NS)
+    while now < end:
+        now += int(rng.expovariate(8.0) * _NS)
+        if rng.random() < 0.02:
+            now += int(rng.uniform(1.0, 4.0) * _NS)
+            events.append(("click", now))
+        else:
+            events.append(("key", now))
+    return events
+
+
+def gaming(seconds: float = 300.0, seed: int = 3) -> list[InputEvent]:
+    """Fast clicking and constant mouse movement, mixed with WASD."""
+    rng = random.Random(seed)
+    events = []
+    now = _START_NS
+    end = _START_NS + int(seconds * _NS)
+    while now < end:
+        now += int(rng.uniform(0.008, 0.02) * _NS)
+        roll = rng.random()
+        if roll < 0.08:
+            events.append(("click", now))
+        elif roll < 0.2:
+            events.append(("key", now))
+        else:
+            events.append(("move", now))
+    return events
+
+
+def idle(periods: int = 40, seed: int = 4) -> list[InputEvent]:
+    """Short bursts of activity separated by long silences."""
+    rng = random.Random(seed)
+    events = []
+    now = _START_NS
+    for _ in range(periods):
+        now += int(rng.uniform(60.0, 600.0) * _NS)
+        for _ in range(rng.randint(1, 6)):
+            now += int(rng.uniform(0.05, 1.0) * _NS)
+            events.append((rng.choice(("move", "click", "key")), now))
+    return events
+
+
+def open_windows(count: int = 150, slacking: int = 3, seed: int = 5) -> list[tuple[str, str]]:
+    """(app, title) pairs for a crowded desktop; a few of them are slacking windows."""
+    rng = random.Random(seed)
+    windows = []
+    for index in range(count - slacking):
+        app_name, title = rng.choice(WORK_WINDOWS)
+        windows.append((app_name, f"[{index}] {title}"))
+    for _ in range(slacking):
+        windows.insert(rng.randrange(len(windows) + 1), rng.choice(SLACKING_WINDOWS))
+    return windows
+
+
+def xprop_lines(count: int = 1000, seed: int = 6) -> list[tuple[str, bool]]:
+    """Lines as printed by `xprop -id <id> WM_CLASS _NET_WM_NAME`, with the prefer_last flag."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        app_name, title = rng.choice(SLACKING_WINDOWS + WORK_WINDOWS)
+        if rng.random() < 0.5:
+            lines.append((f'WM_CLASS(STRING) = "{app_name.lower()}", "{app_name}"', True))
+        else:
+            lines.append((f'_NET_WM_NAME(UTF8_STRING) = "{title}"', False))
+    return lines
+
+
+def unique_titles(count: int = 5000, seed: Optional[int] = 7) -> list[tuple[str, str]]:
+    """Distinct window titles, so matcher lookups miss its cache."""
+    rng = random.Random(seed)
+    pool = SLACKING_WINDOWS + WORK_WINDOWS
+    return [
+        (app_name, f"{title} ({index})")
+        for index, (app_name, title) in enumerate(rng.choice(pool) for _ in range(count))
+    ]
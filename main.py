@@ -1,26 +1,46 @@
-from slack_detection.input_recording import InputActivityFilter
+from slack_detection.input_recording import InputActivityFilter, drain_global_input, reset_periodic_input
 from slack_detection.global_input import start_global_input_monitor
-from slack_detection.detection import (
-    SlackDetectionState,
-    detect_scrolling,
-    detect_inactivity,
-    detect_active_slacking_window,
-)
+from slack_detection.window_watcher import start_active_window_watcher
+from slack_detection.context import DetectionContext, run_detectors
+from slack_detection.detection import SlackDetectionState, is_slacking_window
+from slack_detection.latency import get_latency_tracker
+from slack_detection.scheduler import SlackCheckScheduler
+from slack_detection.trace import TraceRecorder
 from slack_detection.__init__ import set_sleep_state_getter, is_sleeping
-from annoyed_actions import bite, make_window_smaller, slap_cursor, splat, reset_splat
-from sleep_state import wake_up, sleep
+from annoyed_actions import bite, make_window_smaller, slap_cursor, splat, splat_frame, reset_splat
+from sleep_state import SLEEP_FPS, sleep_frame, wake_up, sleep
+from sprite_atlas import SpriteAtlas, default_cache_path
+from sprite_cache import SpriteCache
+from timeline import Ticker
 from utils import preload_sound_effects
+from window_registry import get_window_registry
+from window_probe import ACTIVE_WINDOW_KEY, get_window_probe, request_active_window
 from CONFIG import *
 
+import math
 import os
 import sys
 import time
 import random
 from pathlib import Path
+from typing import Optional
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 
+CANVAS_SIZE = 500 #  Window size while sleeping / debugging; otherwise it wraps the sprite
+SPRITE_MARGIN = 8
+#  Sprite file -> Nibbles attribute; the first one is decoded before the window shows
+SPRITE_ATTRIBUTES = {
+    "idle.png": "pm_idle",
+    "drag.png": "pm_drag",
+    "walk_1.png": "pm_angry",
+    "walk_2.png": "pm_suspicious",
+    "pancake.png": "pm_pancake",
+    "splat.png": "pm_splat",
+    "bite.png": "pm_bite",
+}
+
 POKE_DIR = Path(__file__).parent / "poke_for_fun"
 if str(POKE_DIR) not in sys.path:
     sys.path.insert(0, str(POKE_DIR))
@@ -42,7 +62,7 @@ class Nibbles(QtWidgets.QWidget):
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
         self.setAttribute(QtCore.Qt.WA_ShowWithoutActivating, True)
         self.setWindowFlag(QtCore.Qt.WindowDoesNotAcceptFocus, True)
-        self.setFixedSize(500, 500)
+        self.setFixedSize(CANVAS_SIZE, CANVAS_SIZE)
         self.setMouseTracking(True)
 
         #  Debug text
@@ -59,6 +79,7 @@ class Nibbles(QtWidgets.QWidget):
         self.ham = HamsterModel()
         self.ham.user_scale = 0.5
         self.assets_dir = Path(__file__).parent / "sprites"
+        self.sprite_cache = SpriteCache()
         self._load_assets()
         self._center_hamster()
 
@@ -86,54 +107,79 @@ class Nibbles(QtWidgets.QWidget):
         self._flip_x = False
 
         # --- animation loop ---
+        #  Steps once per display frame on the shared timeline, only while something
+        #  animates (see _is_animating); update() restarts it
         self.last_frame_time = time.time()
-        self.anim_timer = QtCore.QTimer(self)
-        self.anim_timer.timeout.connect(self._tick)
-        self.anim_timer.start(16)  # ~60 FPS
+        self.anim_timer = Ticker(self._tick)
+        self.anim_timer.start()
+        self._painted_signature: Optional[tuple] = None
+        self._painted_rect = QtCore.QRect()
+        self._fitted_signature: Optional[tuple] = None
 
         self.sleeping = False
+        self._sleep_animation = None  # set by sleep_state.sleep
         self.slack_state = SlackDetectionState()
 
         set_sleep_state_getter(lambda: self.sleeping)
 
         self.input_filter = InputActivityFilter(self.slack_state)
         QtWidgets.QApplication.instance().installEventFilter(self.input_filter)
+        #  Slack checks run at the next verdict deadline or right after input/window events
+        self.slack_scheduler = SlackCheckScheduler(
+            self.check_slacking,
+            self._next_slack_deadline,
+            parent=self,
+        )
+        self.slack_state.activity_listeners.append(self._on_input_activity)
+        self.trace_recorder: Optional[TraceRecorder] = None
+        if INPUT_TRACE_PATH:
+            #  Record every input/window event for offline replay (python -m slack_detection.trace)
+            self.trace_recorder = TraceRecorder(INPUT_TRACE_PATH)
+            self.trace_recorder.attach(self.slack_state)
+            QtWidgets.QApplication.instance().aboutToQuit.connect(self.trace_recorder.close)
+        self.slack_state.global_input_queue.wake = self.slack_scheduler.wake
         self.global_input_stop = start_global_input_monitor(self.slack_state)
-
-        self.slack_check_timer = QtCore.QTimer(self)
-        self.slack_check_timer.setInterval(20)
-        self.slack_check_timer.timeout.connect(self.check_slacking)
-        self.slack_check_timer.start()
+        self.window_watcher_stop = start_active_window_watcher(
+            self.slack_state,
+            on_change=self._on_window_change,
+        )
+        if self.window_watcher_stop is None:
+            #  Without window events, window changes are only seen by polling the probe
+            self.slack_scheduler.max_interval_s = 1.0
+        self._last_probed_window = None
+        get_window_probe().result_ready.connect(self._on_window_probe_result)
+        self.last_slack_action_time = float("-inf")
+        self.slack_scheduler.start()
         self.last_slap_time = 0.0
         self.slap_cooldown_s = 3.0
         self._debug_last_update = 0.0
         self._debug_interval_s = 0.2
 
     def check_slacking(self) -> None:
+        #  Global input threads only queue events; they reach the detectors here
+        drain_global_input(self.slack_state)
         if is_sleeping(): #  When sleeping, slacking tracking is turned off
             return
+        verdict_ns = time.monotonic_ns()
 
-        #  Scrolling social media
-        scrolling = detect_scrolling(
-            self.slack_state,
-            min_events=REELS_SCROLLED,
-            min_period_s=0.62,
-            max_period_s=TIME_PER_REEL+TIME_PER_REEL_DEVIATION,
-            max_jitter_ratio=1,
-        )
-
-        #  Daydreaming
-        idle = detect_inactivity(self.slack_state, idle_seconds=DAYDREAMING_THRESHOLD)
-
-        #  Straight slacking
-        window_slack = detect_active_slacking_window(
+        #  One context per check: the active window is looked up at most once for all detectors.
+        #  Without a watcher it comes from the probe's latest answer (never blocks).
+        context = DetectionContext(
             self.slack_state,
-            threshold_seconds=SLACKING_THRESHOLD,
+            active_window_lookup=request_active_window,
         )
+        verdicts = run_detectors(context)
+        scrolling = verdicts["scrolling"] #  Scrolling social media
+        idle = verdicts["idle"] #  Daydreaming
+        window_slack = verdicts["window_slack"] #  Straight slacking
         if scrolling or idle or window_slack:
+            if verdict_ns / 1e9 - self.last_slack_action_time < SLACK_ACTION_COOLDOWN:
+                #  Still true from the last reaction; _next_slack_deadline wakes us when the cooldown ends
+                return
+            self.last_slack_action_time = verdict_ns / 1e9
+            input_ns = self._slack_trigger_ns(scrolling, idle, verdict_ns)
             #  Reset
-            self.slack_state.click_timestamps.clear() 
-            self.slack_state.scroll_timestamps.clear()
+            reset_periodic_input(self.slack_state)
             self.slack_state.last_input_time = 0
 
             if scrolling: #  Active slacking
@@ -142,10 +188,7 @@ class Nibbles(QtWidgets.QWidget):
                 
             elif idle: 
                 print("Idle")
-                if detect_active_slacking_window(
-                    self.slack_state,
-                    threshold_seconds=0
-                ):
+                if context.active_window_slacking:
                     possible_actions = ["make_window_smaller", "bite", "splat"]
                 else:
                     possible_actions = ["splat"]
@@ -153,7 +196,10 @@ class Nibbles(QtWidgets.QWidget):
                 print("window slack")
                 possible_actions = ["make_window_smaller", "bite", "splat"]
 
-            match random.choice(possible_actions):
+            action = random.choice(possible_actions)
+            #  Each action reports when it reaches the screen, see slack_detection.latency
+            get_latency_tracker().begin(action, input_ns, verdict_ns)
+            match action:
                 case "make_window_smaller":
                     make_window_smaller(self)
                 case "bite":
@@ -163,20 +209,81 @@ class Nibbles(QtWidgets.QWidget):
                 case "splat":
                     splat(self)
 
+    def _slack_trigger_ns(self, scrolling: bool, idle: bool, verdict_ns: int) -> int:
+        """When the detector that fired became true (monotonic ns), for latency tracking."""
+        state = self.slack_state
+        if scrolling:
+            latest = [ring[-1] for ring in (state.click_timestamps, state.scroll_timestamps) if ring]
+            return min(verdict_ns, max(latest, default=verdict_ns))
+        if idle:
+            if not state.last_input_time: #  Reset by the previous reaction, no real deadline
+                return verdict_ns
+            deadline = state.last_input_time + DAYDREAMING_THRESHOLD
+        else:
+            deadline = state.active_window_started_at + SLACKING_THRESHOLD
+        return min(verdict_ns, int(deadline * 1e9))
+
+    def _next_slack_deadline(self) -> Optional[float]:
+        """Earliest future time at which check_slacking can react: a verdict flips or the cooldown ends."""
+        now = time.monotonic()
+        state = self.slack_state
+        cooldown_until = self.last_slack_action_time + SLACK_ACTION_COOLDOWN
+        deadlines = [state.last_input_time + DAYDREAMING_THRESHOLD]
+        if is_slacking_window(state.active_app, state.active_title):
+            deadlines.append(state.active_window_started_at + SLACKING_THRESHOLD)
+        #  A verdict that is already true reacts again once the cooldown ends; the end of the
+        #  cooldown is a deadline of its own for scrolling verdicts it held back
+        upcoming = [max(deadline, cooldown_until) for deadline in deadlines] + [cooldown_until]
+        upcoming = [deadline for deadline in upcoming if deadline > now]
+        return min(upcoming) if upcoming else None
+
+    def _on_input_activity(self, kind: str, _timestamp_ns: int) -> None:
+        #  Keys and moves only push the idle deadline back; no verdict can flip on them
+        if kind in ("click", "scroll"):
+            self.slack_scheduler.wake()
+
+    def _on_window_change(self) -> None:
+        #  Called from the window watcher thread
+        get_window_registry().invalidate()
+        if self.trace_recorder is not None:
+            watched = self.slack_state.watched_active_window
+            if watched is not None:
+                self.trace_recorder.record_window(watched[0], watched[1])
+        self.slack_scheduler.wake()
+
+    def _on_window_probe_result(self, key: object, result: object) -> None:
+        if key != ACTIVE_WINDOW_KEY or result == self._last_probed_window:
+            return
+        self._last_probed_window = result
+        #  A failed probe answers None; there is no window to record then
+        if self.trace_recorder is not None and result is not None:
+            self.trace_recorder.record_window(*result)
+        self.slack_scheduler.wake()
+
     def _load_assets(self) -> None:
-        def load(name: str) -> QtGui.QPixmap:
-            pixmap = QtGui.QPixmap(str(self.assets_dir / name))
-            if pixmap.isNull():
-                raise FileNotFoundError(f"Could not load {self.assets_dir / name}")
-            return pixmap
-
-        self.pm_idle = load("idle.png")
-        self.pm_drag = load("drag.png")
-        self.pm_angry = load("walk_1.png")
-        self.pm_suspicious = load("walk_2.png")
-        self.pm_pancake = load("pancake.png")
-        self.pm_splat = load("splat.png")
-        self.pm_bite = load("bite.png")
+        """Show with the idle sprite at once; the other sprites replace it as they decode."""
+        self.sprite_atlas = SpriteAtlas(
+            self.assets_dir,
+            list(SPRITE_ATTRIBUTES),
+            cache_path=default_cache_path() if SPRITE_ATLAS_CACHE else None,
+            parent=self,
+        )
+        self.sprite_atlas.sprite_loaded.connect(self._on_sprite_loaded)
+        self.sprite_atlas.sprite_failed.connect(self._on_sprite_failed)
+        idle = self.sprite_atlas.load()
+        for name, attribute in SPRITE_ATTRIBUTES.items():
+            if self.sprite_atlas.pixmap(name) is None:
+                setattr(self, attribute, idle)
+
+    def _on_sprite_loaded(self, name: str, pixmap: QtGui.QPixmap) -> None:
+        setattr(self, SPRITE_ATTRIBUTES[name], pixmap)
+        self.sprite_cache.add(pixmap)
+        if self.isVisible():
+            self.update()
+
+    def _on_sprite_failed(self, name: str, message: str) -> None:
+        #  Missing files already raised in load(); a corrupt one keeps the idle sprite
+        print(f"sprites: {message}, showing idle instead of {name}")
 
     def _center_hamster(self) -> None:
         self.ham.x = self.width() / 2
@@ -230,20 +337,150 @@ class Nibbles(QtWidgets.QWidget):
         clamped = self._clamp_to_screen(self.pos())
         if clamped != self.pos():
             self.move(clamped)
+        self._repaint_if_dirty()
+        if not self._is_animating():
+            self.anim_timer.stop()
+            if self._sleep_animation is not None:
+                self._sleep_animation.pause(time.monotonic())
+        elif self.sleeping:
+            #  Sleep frames change a few times a second: tick when the next one is due
+            animation = self._sleep_animation
+            animation.resume(time.monotonic())
+            self.anim_timer.start(max(1000 // SLEEP_FPS, animation.ms_until_next_frame(time.monotonic())))
+        elif self.anim_timer.interval() != 0:
+            self.anim_timer.start(0)
         if self.debug_mode and now - self._debug_last_update >= self._debug_interval_s:
             self._debug_last_update = now
             self.debug_label.setText(
                 "Input: clicks={clicks} scrolls={scrolls} keys={keys} "
-                "last={last:.2f}s global={status} g_events={g_events}".format(
+                "last={last:.2f}s global={status} g_events={g_events} "
+                "g_merged={g_merged} g_dropped={g_dropped} "
+                "window={window_status} w_restarts={window_restarts} "
+                "checks={checks}{latency}".format(
                     clicks=len(self.slack_state.click_timestamps),
                     scrolls=len(self.slack_state.scroll_timestamps),
                     keys=len(self.slack_state.key_timestamps),
-                    last=now - self.slack_state.last_input_time,
+                    last=time.monotonic() - self.slack_state.last_input_time,
                     status=self.slack_state.global_input_status,
                     g_events=self.slack_state.global_input_events,
+                    g_merged=self.slack_state.global_input_queue.merged,
+                    g_dropped=self.slack_state.global_input_queue.dropped,
+                    window_status=self.slack_state.window_watcher_status,
+                    window_restarts=self.slack_state.window_watcher_restarts,
+                    checks=self.slack_scheduler.wakeups,
+                    latency="".join(f"\n{line}" for line in get_latency_tracker().summary_lines()),
                 )
             )
-        self.update()
+
+    def _is_animating(self) -> bool:
+        """Whether the next frame can differ from this one without any new event."""
+        if self.sleeping:
+            return self._sleep_animation is not None and self._sleep_visible()
+        if self.ham.state in (HamsterState.SINGLE_REACT, HamsterState.PANCAKE):
+            return True
+        #  A single poke turns into a reaction once the combo window has passed
+        if self.ham.poke_count == 1:
+            return True
+        return self.drag_sprite_active or self.debug_mode
+
+    def _sleep_visible(self) -> bool:
+        """False while minimized, hidden or (where the platform reports it) fully covered."""
+        if not self.isVisible() or self.isMinimized():
+            return False
+        handle = self.windowHandle()
+        return handle is None or handle.isExposed()
+
+    def update(self, *args) -> None:
+        """Schedule a repaint and make sure the animation clock is running."""
+        if not self.anim_timer.isActive():
+            self.last_frame_time = time.time()
+            self.anim_timer.start(0)
+        super().update(*args)
+
+    def _fit_window(self) -> None:
+        """Shrink-wrap the window around the sprite and shape it by the sprite's alpha.
+
+        The sprite stays put on screen. While a tween runs the window only grows
+        (no mask, nothing clipped); once it settles it shrinks to the sprite plus
+        SPRITE_MARGIN and gets the sprite's alpha as its shape, so the compositor
+        blends and the window intercepts clicks only where the hamster is visible.
+        Sleep and debug keep the full canvas; splat manages its own geometry.
+        """
+        settled = not self._is_animating()
+        canvas = self.sleeping or self.debug_mode
+        if self._is_splat_active():
+            settled = canvas = False
+            target = self.size()
+        elif canvas:
+            target = QtCore.QSize(CANVAS_SIZE, CANVAS_SIZE)
+        else:
+            target = self._sprite_frame()[1].size() + QtCore.QSize(2 * SPRITE_MARGIN, 2 * SPRITE_MARGIN)
+        size = self.size()
+        if not settled:
+            target = target.expandedTo(size)
+        if target != size:
+            center = self.pos() + QtCore.QPoint(int(round(self.ham.x)), int(round(self.ham.y)))
+            self.setFixedSize(target)  # resizeEvent re-centers the hamster
+            top_left = center - QtCore.QPoint(target.width() // 2, target.height() // 2)
+            self.move(self._clamp_to_screen(top_left))
+        if settled and not canvas:
+            frame, rect = self._sprite_frame()
+            self.setMask(self.sprite_cache.alpha_region(frame).translated(rect.topLeft()))
+            self._fitted_signature = (frame.cacheKey(), rect.x(), rect.y())
+        else:
+            if not self.mask().isEmpty():
+                self.clearMask()
+            self._fitted_signature = None
+
+    def _sprite_frame(self) -> tuple[QtGui.QPixmap, QtCore.QRect]:
+        """Cached sprite pixmap for the current state and the widget rect it is drawn to."""
+        pm, sx, sy = self._current_pixmap_and_squash()
+        frame = self.sprite_cache.get(
+            pm,
+            self.ham.user_scale,
+            sx,
+            sy,
+            self._rotation_deg,
+            self._flip_x,
+            self.devicePixelRatioF(),
+        )
+        dpr = frame.devicePixelRatio()
+        width = int(math.ceil(frame.width() / dpr))
+        height = int(math.ceil(frame.height() / dpr))
+        left = int(round(self.ham.x - width / 2))
+        top = int(round(self.ham.y - height / 2))
+        return frame, QtCore.QRect(left, top, width, height)
+
+    def _sleep_frame_and_rect(self) -> tuple[Optional[QtGui.QPixmap], QtCore.QRect]:
+        frame = sleep_frame(self)
+        if frame is None:
+            return None, QtCore.QRect()
+        rect = QtCore.QRect(QtCore.QPoint(), frame.size() / frame.devicePixelRatio())
+        rect.moveCenter(self.rect().center())
+        return frame, rect
+
+    def _repaint_if_dirty(self) -> None:
+        splat_pixmap = None if self.sleeping else splat_frame(self)
+        if self.sleeping:
+            if self.size() != QtCore.QSize(CANVAS_SIZE, CANVAS_SIZE):
+                self._fit_window()
+            frame, rect = self._sleep_frame_and_rect()
+            signature = ("sleeping", frame.cacheKey() if frame is not None else None)
+        elif splat_pixmap is not None:
+            #  Re-rendered only when the screen, DPR or pose changed; otherwise nothing to do
+            signature = ("splat", splat_pixmap.cacheKey())
+            rect = self.rect()
+        else:
+            frame, rect = self._sprite_frame()
+            signature = (frame.cacheKey(), rect.x(), rect.y())
+            if signature != self._fitted_signature:
+                self._fit_window()
+                frame, rect = self._sprite_frame()
+                signature = (frame.cacheKey(), rect.x(), rect.y())
+        if signature == self._painted_signature:
+            return
+        #  Only the old and the new sprite bounds need repainting
+        super().update(rect.united(self._painted_rect))
 
     def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
         super().resizeEvent(event)
@@ -306,6 +543,7 @@ class Nibbles(QtWidgets.QWidget):
         self.dragging = False
         self.drag_targeted = False
         self.drag_sprite_active = False
+        self.update()
         self.long_press_timer.stop()
         if self.long_press_triggered:
             self.press_pos = None
@@ -341,6 +579,7 @@ class Nibbles(QtWidgets.QWidget):
     def _slap_cursor_if_ready(self) -> None:
         now = time.time()
         if now - self.last_slap_time < self.slap_cooldown_s:
+            get_latency_tracker().cancel("slap_cursor")
             return
         slap_cursor(self)
         self.last_slap_time = now
@@ -362,6 +601,7 @@ class Nibbles(QtWidgets.QWidget):
             wake_up(self)
         else:
             sleep(self)
+            self.update()
 
     def mouseDoubleClickEvent(self, event: QtGui.QMouseEvent) -> None:
         if event.button() == QtCore.Qt.LeftButton and self._is_splat_active():
@@ -377,36 +617,31 @@ class Nibbles(QtWidgets.QWidget):
         )
         
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        painter = QtGui.QPainter(self)
         if self.sleeping:
+            frame, rect = self._sleep_frame_and_rect()
+            if frame is not None:
+                painter.drawPixmap(rect.topLeft(), frame)
+            self._painted_signature = ("sleeping", frame.cacheKey() if frame is not None else None)
+            self._painted_rect = rect
+            #  Exposed again after being covered or minimized: resume the animation clock
+            if not self.anim_timer.isActive() and self._is_animating():
+                self.anim_timer.start(1000 // SLEEP_FPS)
             return
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
 
-        pm, sx, sy = self._current_pixmap_and_squash()
-        base_w = pm.width() * self.ham.user_scale
-        base_h = pm.height() * self.ham.user_scale
-        draw_w = base_w * sx
-        draw_h = base_h * sy
-
-        target = QtCore.QRectF(
-            self.ham.x - draw_w / 2,
-            self.ham.y - draw_h / 2,
-            draw_w,
-            draw_h,
-        )
-        if self._rotation_deg % 360 or self._flip_x:
-            painter.save()
-            center = target.center()
-            painter.translate(center)
-            if self._rotation_deg % 360:
-                painter.rotate(self._rotation_deg)
-            if self._flip_x:
-                painter.scale(-1, 1)
-            painter.translate(-center)
-            painter.drawPixmap(target, pm, QtCore.QRectF(pm.rect()))
-            painter.restore()
-        else:
-            painter.drawPixmap(target, pm, QtCore.QRectF(pm.rect()))
+        splat_pixmap = splat_frame(self)
+        if splat_pixmap is not None:
+            painter.drawPixmap(0, 0, splat_pixmap)
+            self._painted_signature = ("splat", splat_pixmap.cacheKey())
+            self._painted_rect = self.rect()
+            get_latency_tracker().visible("splat")
+            return
+
+        #  Pre-scaled, pre-rotated sprite from the cache, blitted 1:1 around the hamster's center
+        frame, rect = self._sprite_frame()
+        painter.drawPixmap(rect.topLeft(), frame)
+        self._painted_signature = (frame.cacheKey(), rect.x(), rect.y())
+        self._painted_rect = rect
 
     def move_to_bottom_right(self) -> None:
         # Use the screen under the mouse, fallback to primary
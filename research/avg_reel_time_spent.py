@@ -27,13 +27,14 @@ data = [
     2.09
 ]
 
-print(f"Sample size: {len(data)}")
-print(f"Average: {sum(data)/len(data):.2f}s")
-print(f"Max: {max(data)}s")
-print(f"Min: {min(data)}s")
-std_dev = statistics.stdev(data)
-print(f"Sample Standard Deviation: {std_dev:.2f}s")
+if __name__ == "__main__":
+    print(f"Sample size: {len(data)}")
+    print(f"Average: {sum(data)/len(data):.2f}s")
+    print(f"Max: {max(data)}s")
+    print(f"Min: {min(data)}s")
+    std_dev = statistics.stdev(data)
+    print(f"Sample Standard Deviation: {std_dev:.2f}s")
 
-# Population standard deviation
-population_std_dev = statistics.pstdev(data)
-print(f"Population Standard Deviation: {population_std_dev:.2f}s")
\ No newline at end of file
+    # Population standard deviation
+    population_std_dev = statistics.pstdev(data)
+    print(f"Population Standard Deviation: {population_std_dev:.2f}s")
\ No newline at end of file
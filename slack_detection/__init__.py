@@ -5,9 +5,13 @@ import platform
 import re
 import time
 import subprocess
-from collections import deque
 from dataclasses import dataclass, field
-from typing import Optional, Sequence, Tuple, Callable, Deque
+from typing import Optional, Sequence, Tuple, Callable, Union
+
+from .input_queue import InputEventQueue
+from .periodicity import PeriodicityTracker
+from .ring_buffer import TimestampRing
+from .x11 import query_active_window
 
 #  Sleep state
 _sleep_state: bool = False
@@ -38,17 +42,30 @@ def is_sleeping() -> bool:
 
 @dataclass
 class SlackDetectionState:
-    last_input_time: float = field(default_factory=time.time)
-    click_timestamps: Deque[float] = field(default_factory=lambda: deque(maxlen=120))
-    scroll_timestamps: Deque[float] = field(default_factory=lambda: deque(maxlen=120))
-    key_timestamps: Deque[float] = field(default_factory=lambda: deque(maxlen=120))
+    #  All times are on the monotonic clock: *_time fields in time.monotonic()
+    #  seconds, ring buffers in time.monotonic_ns(), so NTP/suspend jumps can't skew them.
+    last_input_time: float = field(default_factory=time.monotonic)
+    click_timestamps: TimestampRing = field(default_factory=lambda: TimestampRing(120))
+    scroll_timestamps: TimestampRing = field(default_factory=lambda: TimestampRing(120))
+    key_timestamps: TimestampRing = field(default_factory=lambda: TimestampRing(120))
+    last_scroll_event_ns: int = 0
+    click_periodicity: PeriodicityTracker = field(default_factory=PeriodicityTracker)
+    scroll_periodicity: PeriodicityTracker = field(default_factory=PeriodicityTracker)
     global_input_status: str = "off"
+    #  Filled by the global input monitor thread, drained by drain_global_input on the GUI thread
+    global_input_queue: InputEventQueue = field(default_factory=InputEventQueue)
     global_input_events: int = 0
     global_last_input_time: float = 0.0
     active_app: str = ""
     active_title: str = ""
-    active_window_started_at: float = field(default_factory=time.time)
+    active_window_started_at: float = field(default_factory=time.monotonic)
+    window_watcher_status: str = "off"
+    window_watcher_events: int = 0
+    window_watcher_restarts: int = 0
+    watched_active_window: Optional[Tuple[Optional[str], Optional[str], float]] = None
     window_seen_at: dict[tuple[str, str], float] = field(default_factory=dict)
+    #  Called as listener(kind, timestamp_ns) for every recorded "click", "scroll", "key" and "move"
+    activity_listeners: list[Callable[[str, int], None]] = field(default_factory=list)
 
 
 def get_active_window_info() -> Tuple[Optional[str], Optional[str]]:
@@ -61,7 +78,7 @@ def get_active_window_info() -> Tuple[Optional[str], Optional[str]]:
 
 
 def _is_periodic(
-    timestamps: Sequence[float],
+    timestamps: Union[TimestampRing, Sequence[float]],
     min_events: int,
     min_period_s: float,
     max_period_s: float,
@@ -70,8 +87,11 @@ def _is_periodic(
     # print(timestamps)
     if len(timestamps) < min_events:
         return False
-    recent = list(timestamps)[-min_events:]
-    intervals = [b - a for a, b in zip(recent, recent[1:]) if b > a]
+    if isinstance(timestamps, TimestampRing):
+        intervals = [gap / 1e9 for gap in timestamps.intervals(min_events) if gap > 0]
+    else:
+        recent = list(timestamps)[-min_events:]
+        intervals = [b - a for a, b in zip(recent, recent[1:]) if b > a]
     if len(intervals) < (min_events - 1):
         return False
     mean_interval = sum(intervals) / len(intervals)
@@ -141,6 +161,10 @@ def _get_active_window_macos() -> Tuple[Optional[str], Optional[str]]:
 
 
 def _get_active_window_linux() -> Tuple[Optional[str], Optional[str]]:
+    active = query_active_window()
+    if active is not None:
+        return active
+    #  Fallback when python-xlib or the X server connection is unavailable
     root_output = _run_command(["xprop", "-root", "_NET_ACTIVE_WINDOW"])
     if not root_output:
         return None, None
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, Optional, Tuple
+
+from CONFIG import *
+from . import SlackDetectionState, get_active_window_info
+from .detection import _note_active_window, is_slacking_window
+from window_registry import WindowInfo, get_window_registry
+
+
+@dataclass(frozen=True)
+class DetectionThresholds:
+    reels_scrolled: int = REELS_SCROLLED
+    min_period_s: float = 0.62
+    max_period_s: float = TIME_PER_REEL + TIME_PER_REEL_DEVIATION
+    max_jitter_ratio: float = 1.0
+    daydreaming_threshold: float = DAYDREAMING_THRESHOLD
+    slacking_threshold: float = SLACKING_THRESHOLD
+
+
+@dataclass(frozen=True)
+class DetectionContext:
+    """What the detectors see during one slack check.
+
+    Built once per check. Every derived value (active window, open windows,
+    periodicity verdicts) is resolved lazily on first use and memoized, so any
+    number of detectors share one window query.
+    """
+
+    state: SlackDetectionState
+    now: float = field(default_factory=time.monotonic)
+    thresholds: DetectionThresholds = field(default_factory=DetectionThresholds)
+    #  Non-blocking (app, title) lookup used when no window watcher is running
+    active_window_lookup: Optional[Callable[[], Tuple[Optional[str], Optional[str]]]] = None
+
+    @cached_property
+    def active_window(self) -> Tuple[Optional[str], Optional[str], float]:
+        """(app, title, focused since) of the focused window."""
+        watched = self.state.watched_active_window
+        if watched is not None:
+            return watched
+        lookup = self.active_window_lookup or get_active_window_info
+        app_name, title = lookup()
+        return app_name, title, self.now
+
+    @cached_property
+    def focused_since(self) -> Optional[float]:
+        """When the focused window got focus, or None if it is unknown."""
+        app_name, title, changed_at = self.active_window
+        if app_name is None and title is None:
+            return None
+        _note_active_window(self.state, app_name, title, changed_at)
+        return self.state.active_window_started_at
+
+    @cached_property
+    def active_window_slacking(self) -> bool:
+        if self.focused_since is None:
+            return False
+        return is_slacking_window(self.state.active_app, self.state.active_title)
+
+    @cached_property
+    def open_windows(self) -> Tuple[WindowInfo, ...]:
+        return get_window_registry().open_windows()
+
+    @cached_property
+    def any_slacking_window_open(self) -> bool:
+        return any(is_slacking_window(window.app_name, window.title) for window in self.open_windows)
+
+    @cached_property
+    def idle_seconds(self) -> float:
+        return self.now - self.state.last_input_time
+
+    def _periodicity_args(self) -> Tuple[int, float, float, float]:
+        thresholds = self.thresholds
+        return (
+            thresholds.reels_scrolled,
+            thresholds.min_period_s,
+            thresholds.max_period_s,
+            thresholds.max_jitter_ratio,
+        )
+
+    @cached_property
+    def clicks_periodic(self) -> bool:
+        return self.state.click_periodicity.verdict(*self._periodicity_args(), self.state.click_timestamps)
+
+    @cached_property
+    def scrolls_periodic(self) -> bool:
+        return self.state.scroll_periodicity.verdict(*self._periodicity_args(), self.state.scroll_timestamps)
+
+
+Detector = Callable[[DetectionContext], bool]
+
+#  Run in registration order; check_slacking reacts to the first one that fires.
+_detectors: dict[str, Detector] = {}
+
+
+def register_detector(name: str) -> Callable[[Detector], Detector]:
+    def decorator(detector: Detector) -> Detector:
+        _detectors[name] = detector
+        return detector
+    return decorator
+
+
+def run_detectors(context: DetectionContext) -> dict[str, bool]:
+    return {name: detector(context) for name, detector in _detectors.items()}
+
+
+@register_detector("scrolling")
+def _detect_scrolling(context: DetectionContext) -> bool:
+    """Periodic clicks or scrolls while a slacking window is focused."""
+    return (context.clicks_periodic or context.scrolls_periodic) and context.active_window_slacking
+
+
+@register_detector("idle")
+def _detect_idle(context: DetectionContext) -> bool:
+    return context.idle_seconds >= context.thresholds.daydreaming_threshold
+
+
+@register_detector("window_slack")
+def _detect_window_slack(context: DetectionContext) -> bool:
+    if not context.active_window_slacking:
+        return False
+    return (context.now - context.focused_since) >= context.thresholds.slacking_threshold
@@ -3,9 +3,9 @@ from __future__ import annotations
 import time
 from typing import Optional, Sequence, Tuple
 
-from . import SlackDetectionState, _is_periodic, get_active_window_info
-from CONFIG import *
-from utils import get_open_window_info
+from . import SlackDetectionState, get_active_window_info
+from .matcher import get_slacking_matcher
+from window_registry import get_window_registry
 
 
 def detect_periodic_clicking(
@@ -15,12 +15,12 @@ def detect_periodic_clicking(
     max_period_s: float,
     max_jitter_ratio: float,
 ) -> bool:
-    return _is_periodic(
-        state.click_timestamps,
+    return state.click_periodicity.verdict(
         min_events,
         min_period_s,
         max_period_s,
         max_jitter_ratio,
+        state.click_timestamps,
     )
 
 
@@ -31,12 +31,12 @@ def detect_periodic_mouse_scrolling(
     max_period_s: float,
     max_jitter_ratio: float,
 ) -> bool:
-    return _is_periodic(
-        state.scroll_timestamps,
+    return state.scroll_periodicity.verdict(
         min_events,
         min_period_s,
         max_period_s,
         max_jitter_ratio,
+        state.scroll_timestamps,
     )
 
 
@@ -68,6 +68,9 @@ def detect_scrolling(
     min_period_s: float,
     max_period_s: float,
     max_jitter_ratio: float,
+    active_app: Optional[str] = None,
+    active_title: Optional[str] = None,
+    now: Optional[float] = None,
 ) -> bool:
     """Detects if the user is slacking.
     The user is slacking if:
@@ -80,7 +83,13 @@ def detect_scrolling(
         min_period_s,
         max_period_s,
         max_jitter_ratio
-    ) and detect_active_slacking_window(state, 0)
+    ) and detect_active_slacking_window(
+        state,
+        0,
+        now=now,
+        active_app=active_app,
+        active_title=active_title,
+    )
 
 
 def detect_inactivity(
@@ -88,7 +97,7 @@ def detect_inactivity(
     idle_seconds: float,
     now: Optional[float] = None,
 ) -> bool:
-    current = time.time() if now is None else now
+    current = time.monotonic() if now is None else now
     return (current - state.last_input_time) >= idle_seconds
 
 
@@ -99,8 +108,13 @@ def detect_active_slacking_window(
     active_app: Optional[str] = None,
     active_title: Optional[str] = None,
 ) -> bool:
-    current = time.time() if now is None else now
-    if active_app is None or active_title is None:
+    current = time.monotonic() if now is None else now
+    changed_at = current
+    watched = state.watched_active_window
+    if active_app is None and active_title is None and watched is not None:
+        #  The window watcher already pushed the focused window; no query needed.
+        active_app, active_title, changed_at = watched
+    elif active_app is None or active_title is None:
         fetched_app, fetched_title = get_active_window_info()
         if active_app is None:
             active_app = fetched_app
@@ -108,13 +122,7 @@ def detect_active_slacking_window(
             active_title = fetched_title
     if active_app is None and active_title is None:
         return False
-    if (
-        active_app != state.active_app
-        or active_title != state.active_title
-    ):
-        state.active_app = active_app or ""
-        state.active_title = active_title or ""
-        state.active_window_started_at = current
+    _note_active_window(state, active_app, active_title, changed_at)
     if not is_slacking_window(
         state.active_app,
         state.active_title
@@ -123,10 +131,28 @@ def detect_active_slacking_window(
     return (current - state.active_window_started_at) >= threshold_seconds
 
 
+def _note_active_window(
+    state: SlackDetectionState,
+    active_app: Optional[str],
+    active_title: Optional[str],
+    changed_at: float,
+) -> None:
+    """Restart the time-on-window clock when the focused window changed."""
+    if (
+        active_app != state.active_app
+        or active_title != state.active_title
+    ):
+        state.active_app = active_app or ""
+        state.active_title = active_title or ""
+        state.active_window_started_at = changed_at
+
+
 def detect_any_slacking_window(
     open_windows: Optional[Sequence[Tuple[Optional[str], Optional[str]]]] = None,
 ) -> bool:
-    windows = open_windows or get_open_window_info()
+    windows = open_windows or [
+        (window.app_name, window.title) for window in get_window_registry().open_windows()
+    ]
     if not windows:
         return False
 
@@ -144,12 +170,4 @@ def is_slacking_window(
     active_app: Optional[str],
     active_title: Optional[str]
 ) -> bool:
-    app_name = (active_app or "").casefold()
-    window_title = (active_title or "").casefold()
-    for keyword in SLACKING_APPS:
-        if keyword and keyword.casefold() in app_name:
-            return True
-    for keyword in SLACKING_TITLE_KEYWORDS:
-        if keyword and keyword.casefold() in window_title:
-            return True
-    return False
+    return get_slacking_matcher().matches(active_app, active_title)
@@ -1,22 +1,27 @@
 from __future__ import annotations
 
+import argparse
 import platform
 import threading
 import time
 from typing import Callable, Optional
 
 from . import SlackDetectionState
-from .input_recording import (
-    record_keypress,
-    record_mouse_click,
-    record_mouse_move,
-    record_mouse_scroll,
-)
+from .input_recording import drain_global_input
+from .x11 import X11_PLATFORMS
+
+
+#  X core button numbers: 4-7 are wheel steps (vertical, then horizontal)
+_X_CLICK_BUTTONS = (1, 2, 3)
+_X_SCROLL_BUTTONS = (4, 5, 6, 7)
 
 
 def start_global_input_monitor(state: SlackDetectionState) -> Optional[Callable[[], None]]:
-    """Start a macOS-only global input monitor. Returns a stop callback or None."""
-    if platform.system().lower() != "darwin":
+    """Start a desktop-wide input monitor (Quartz on macOS, XRecord on X11). Returns a stop callback or None."""
+    system = platform.system().lower()
+    if system in X11_PLATFORMS:
+        return start_xrecord_input_monitor(state)
+    if system != "darwin":
         state.global_input_status = "unsupported"
         return None
 
@@ -28,24 +33,24 @@ def start_global_input_monitor(state: SlackDetectionState) -> Optional[Callable[
         return None
 
     run_loop_holder: dict[str, object] = {}
+    queue = state.global_input_queue
     state.global_input_status = "starting"
 
+    #  Runs on the tap thread: only hand events over, drain_global_input records them.
     def _callback(_proxy, event_type, _event, _refcon):
-        now = time.time()
-        state.global_input_events += 1
-        state.global_last_input_time = now
+        now = time.monotonic_ns()
         if event_type == Quartz.kCGEventScrollWheel:
-            record_mouse_scroll(state, now)
+            queue.push("scroll", now)
         elif event_type in (Quartz.kCGEventLeftMouseDown, Quartz.kCGEventRightMouseDown):
-            record_mouse_click(state, now)
+            queue.push("click", now)
         elif event_type == Quartz.kCGEventKeyDown:
-            record_keypress(state, now)
+            queue.push("key", now)
         elif event_type in (
             Quartz.kCGEventMouseMoved,
             Quartz.kCGEventLeftMouseDragged,
             Quartz.kCGEventRightMouseDragged,
         ):
-            record_mouse_move(state, now)
+            queue.push("move", now)
         return _event
 
     def _run_loop():
@@ -90,3 +95,143 @@ def start_global_input_monitor(state: SlackDetectionState) -> Optional[Callable[
             Quartz.CFRunLoopStop(run_loop)
 
     return stop
+
+
+def start_xrecord_input_monitor(state: SlackDetectionState) -> Optional[Callable[[], None]]:
+    """Record every client's input through the X RECORD extension. Returns a stop callback or None.
+
+    The recording runs on its own X connection in a thread, since
+    record_enable_context blocks until a second (control) connection disables
+    the context. Works under Xvfb, so xdotool-generated input is seen too.
+    """
+    try:
+        from Xlib import X, display  # type: ignore
+        from Xlib.ext import record  # type: ignore
+        from Xlib.protocol import rq  # type: ignore
+    except Exception:
+        state.global_input_status = "missing python-xlib"
+        print("Global input monitor unavailable: install python-xlib for XRecord access.")
+        return None
+
+    try:
+        control = display.Display()
+    except Exception:
+        state.global_input_status = "no display"
+        return None
+    try:
+        recorder = display.Display()
+    except Exception:
+        state.global_input_status = "no display"
+        control.close()
+        return None
+    if not recorder.has_extension("RECORD"):
+        state.global_input_status = "missing XRecord"
+        control.close()
+        recorder.close()
+        return None
+
+    context = control.record_create_context(
+        0,
+        [record.AllClients],
+        [{
+            "core_requests": (0, 0),
+            "core_replies": (0, 0),
+            "ext_requests": (0, 0, 0, 0),
+            "ext_replies": (0, 0, 0, 0),
+            "delivered_events": (0, 0),
+            "device_events": (X.KeyPress, X.MotionNotify),
+            "errors": (0, 0),
+            "client_started": False,
+            "client_died": False,
+        }],
+    )
+    control.sync()
+    event_field = rq.EventField(None)
+    queue = state.global_input_queue
+    ready = threading.Event()
+    state.global_input_status = "starting"
+
+    def _callback(reply) -> None:
+        if reply.category != record.FromServer or reply.client_swapped:
+            return
+        data = reply.data
+        if not data or data[0] < 2:
+            return
+        #  One reply can carry several events; they share a timestamp and one queue push.
+        now = time.monotonic_ns()
+        batch = []
+        while data:
+            event, data = event_field.parse_binary_value(data, recorder.display, None, None)
+            if event.type == X.ButtonPress:
+                if event.detail in _X_SCROLL_BUTTONS:
+                    batch.append(("scroll", now))
+                elif event.detail in _X_CLICK_BUTTONS:
+                    batch.append(("click", now))
+            elif event.type == X.KeyPress:
+                batch.append(("key", now))
+            elif event.type == X.MotionNotify:
+                batch.append(("move", now))
+        if batch:
+            queue.push_batch(batch)
+
+    def _run_loop() -> None:
+        state.global_input_status = "active (xrecord)"
+        ready.set()
+        try:
+            #  Blocks until stop() disables the context from the control connection.
+            recorder.record_enable_context(context, _callback)
+        except Exception:
+            state.global_input_status = "error (xrecord)"
+        finally:
+            recorder.close()
+
+    thread = threading.Thread(target=_run_loop, name="GlobalInputMonitor", daemon=True)
+    thread.start()
+    ready.wait(1.0)
+
+    def stop() -> None:
+        state.global_input_status = "stopped"
+        try:
+            control.record_disable_context(context)
+            control.flush()
+            thread.join(timeout=1.0)
+            control.record_free_context(context)
+            control.close()
+        except Exception:
+            pass
+
+    return stop
+
+
+def _main(argv: Optional[list[str]] = None) -> int:
+    """Smoke test: print what the monitor sees, e.g. under Xvfb with xdotool input."""
+    parser = argparse.ArgumentParser(description="Print events seen by the global input monitor.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="how long to listen")
+    args = parser.parse_args(argv)
+
+    state = SlackDetectionState()
+    state.activity_listeners.append(lambda kind, timestamp: print(kind, timestamp, flush=True))
+    stop = start_global_input_monitor(state)
+    print(f"status: {state.global_input_status}", flush=True)
+    if stop is None:
+        return 1
+    deadline = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            drain_global_input(state)
+    except KeyboardInterrupt:
+        pass
+    stop()
+    drain_global_input(state)
+    queue = state.global_input_queue
+    print(
+        f"events={state.global_input_events} clicks={len(state.click_timestamps)} "
+        f"scrolls={len(state.scroll_timestamps)} keys={len(state.key_timestamps)} "
+        f"merged={queue.merged} dropped={queue.dropped}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Deque, Iterable, Optional, Tuple
+
+#  (kind, time.monotonic_ns()) with kind one of "click", "scroll", "key", "move"
+InputEvent = Tuple[str, int]
+
+
+class InputEventQueue:
+    """Single-producer/single-consumer handoff from a global input thread to the GUI thread.
+
+    The monitor thread pushes clicks, scrolls and keys; mouse moves are not
+    queued at all but folded into one "latest move" timestamp, so a move flood
+    costs two attribute writes per event and the consumer sees at most one
+    activity record per drain. The GUI thread drains everything once per
+    slack evaluation. Relies on deque append/popleft being atomic, which holds
+    as long as there is exactly one producer and one consumer.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        self._events: Deque[InputEvent] = deque()
+        #  Written only by the producer
+        self._move_ns = 0
+        self._moves = 0
+        self.received = 0
+        self.pushed = 0
+        self.dropped = 0
+        #  Written only by the consumer
+        self._drained_moves = 0
+        self.merged = 0
+        self.delivered = 0
+        #  Called on the producer thread after clicks/scrolls, e.g. SlackCheckScheduler.wake
+        self.wake: Optional[Callable[[], None]] = None
+
+    def push(self, kind: str, timestamp_ns: int) -> None:
+        self.received += 1
+        if kind == "move":
+            self._move_ns = timestamp_ns
+            self._moves += 1
+            return
+        if len(self._events) >= self.capacity:
+            self.dropped += 1
+            return
+        self._events.append((kind, timestamp_ns))
+        self.pushed += 1
+        if kind != "key" and self.wake is not None:
+            self.wake()
+
+    def push_batch(self, events: Iterable[InputEvent]) -> None:
+        """Push everything one X RECORD reply (or similar) delivered; wakes at most once."""
+        wake = False
+        for kind, timestamp_ns in events:
+            self.received += 1
+            if kind == "move":
+                self._move_ns = timestamp_ns
+                self._moves += 1
+                continue
+            if len(self._events) >= self.capacity:
+                self.dropped += 1
+                continue
+            self._events.append((kind, timestamp_ns))
+            self.pushed += 1
+            wake = wake or kind != "key"
+        if wake and self.wake is not None:
+            self.wake()
+
+    def drain(self) -> list[InputEvent]:
+        """Everything pushed since the last drain, oldest first; merged moves come back as one "move"."""
+        events = [self._events.popleft() for _ in range(len(self._events))]
+        moves = self._moves
+        if moves != self._drained_moves:
+            move = ("move", self._move_ns)
+            self.merged += moves - self._drained_moves - 1
+            self._drained_moves = moves
+            #  Keep timestamps ascending so last_input_time never goes backwards
+            index = len(events)
+            while index and events[index - 1][1] > move[1]:
+                index -= 1
+            events.insert(index, move)
+        self.delivered += len(events)
+        return events
+
+    def __len__(self) -> int:
+        return len(self._events)
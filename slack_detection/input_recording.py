@@ -16,7 +16,7 @@ class InputActivityFilter(QtCore.QObject):
         self.state = state
 
     def eventFilter(self, _obj: QtCore.QObject, event: QtCore.QEvent) -> bool:
-        now = time.time()
+        now = time.monotonic_ns()
         event_type = event.type()
         if event_type == QtCore.QEvent.MouseButtonPress:
             record_mouse_click(self.state, now)
@@ -30,31 +30,72 @@ class InputActivityFilter(QtCore.QObject):
 
 
 #  Recording input
-def record_mouse_click(state: SlackDetectionState, timestamp: Optional[float] = None) -> None:
-    now = time.time() if timestamp is None else timestamp
-    state.last_input_time = now
+#  Timestamps are time.monotonic_ns() ints
+def record_mouse_click(state: SlackDetectionState, timestamp: Optional[int] = None) -> None:
+    now = time.monotonic_ns() if timestamp is None else timestamp
+    state.last_input_time = now / 1e9
     state.click_timestamps.append(now)
+    state.click_periodicity.add(now)
+    _notify_activity(state, "click", now)
 
 
 def record_mouse_scroll(
     state: SlackDetectionState,
-    timestamp: Optional[float] = None,
+    timestamp: Optional[int] = None,
     debounce_s: float = 0.25,
 ) -> None:
-    now = time.time() if timestamp is None else timestamp
-    state.last_input_time = now
-    last_event = getattr(state, "last_scroll_event_time", 0.0)
-    if (now - last_event) >= debounce_s:
+    now = time.monotonic_ns() if timestamp is None else timestamp
+    state.last_input_time = now / 1e9
+    if (now - state.last_scroll_event_ns) >= debounce_s * 1e9:
         state.scroll_timestamps.append(now)
-    state.last_scroll_event_time = now
+        state.scroll_periodicity.add(now)
+    state.last_scroll_event_ns = now
+    _notify_activity(state, "scroll", now)
 
 
-def record_keypress(state: SlackDetectionState, timestamp: Optional[float] = None) -> None:
-    now = time.time() if timestamp is None else timestamp
-    state.last_input_time = now
+def record_keypress(state: SlackDetectionState, timestamp: Optional[int] = None) -> None:
+    now = time.monotonic_ns() if timestamp is None else timestamp
+    state.last_input_time = now / 1e9
     state.key_timestamps.append(now)
+    _notify_activity(state, "key", now)
 
 
-def record_mouse_move(state: SlackDetectionState, timestamp: Optional[float] = None) -> None:
-    now = time.time() if timestamp is None else timestamp
-    state.last_input_time = now
+def record_mouse_move(state: SlackDetectionState, timestamp: Optional[int] = None) -> None:
+    now = time.monotonic_ns() if timestamp is None else timestamp
+    state.last_input_time = now / 1e9
+    _notify_activity(state, "move", now)
+
+
+def _notify_activity(state: SlackDetectionState, kind: str, timestamp: int) -> None:
+    for listener in state.activity_listeners:
+        try:
+            listener(kind, timestamp)
+        except Exception:
+            pass
+
+
+def drain_global_input(state: SlackDetectionState) -> int:
+    """Apply the events queued by the global input monitor. GUI thread only; returns how many."""
+    queue = state.global_input_queue
+    events = queue.drain()
+    for kind, timestamp in events:
+        if kind == "click":
+            record_mouse_click(state, timestamp)
+        elif kind == "scroll":
+            record_mouse_scroll(state, timestamp)
+        elif kind == "key":
+            record_keypress(state, timestamp)
+        else:
+            record_mouse_move(state, timestamp)
+    state.global_input_events = queue.received
+    if events:
+        state.global_last_input_time = events[-1][1] / 1e9
+    return len(events)
+
+
+def reset_periodic_input(state: SlackDetectionState) -> None:
+    """Forget click/scroll history, e.g. after the hamster has reacted to it."""
+    state.click_timestamps.clear()
+    state.scroll_timestamps.clear()
+    state.click_periodicity.clear()
+    state.scroll_periodicity.clear()
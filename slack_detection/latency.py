@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+#  Stages of one slack decision, all time.monotonic_ns():
+#  input    the event that made a detector true (last scroll/click, idle or window deadline)
+#  verdict  check_slacking saw the detector verdict
+#  chosen   check_slacking picked the action
+#  visible  the action reached the screen (overlay painted, cursor moved, window resized)
+SEGMENTS = (
+    ("input", "verdict"),
+    ("verdict", "chosen"),
+    ("chosen", "visible"),
+    ("input", "visible"),
+)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of ns values.
+
+    Every power of two is split into 2 ** (sub_bucket_bits - 1) buckets, so any
+    recorded value is reported within ~1 / 2 ** (sub_bucket_bits - 1) of itself
+    (3% with the default) while memory stays proportional to the value range's
+    log. Percentiles report the highest value equivalent to the bucket.
+    """
+
+    __slots__ = ("sub_bucket_bits", "_sub_count", "_half", "counts", "total", "max_ns")
+
+    def __init__(self, sub_bucket_bits: int = 6) -> None:
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._half = self._sub_count >> 1
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.max_ns = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return (shift * self._half) + (value >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        shift = index // self._half - 1
+        sub_bucket = index - shift * self._half
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value_ns: int) -> None:
+        value_ns = max(0, int(value_ns))
+        index = self._index(value_ns)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, q: float) -> int:
+        if not self.total:
+            return 0
+        #  Nearest rank: the smallest value with at least q% of the samples at or below it
+        rank = max(1, math.ceil(q / 100.0 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max_ns)
+        return self.max_ns
+
+
+class RollingLatencyHistogram:
+    """LatencyHistogram over the last window_s seconds, rotated in `slices` steps."""
+
+    def __init__(self, window_s: float = 600.0, slices: int = 6, sub_bucket_bits: int = 6) -> None:
+        self.slice_s = window_s / max(1, slices)
+        self.slices = max(1, slices)
+        self.sub_bucket_bits = sub_bucket_bits
+        self._slices: list[tuple[float, LatencyHistogram]] = []
+
+    def _rotate(self, now: float) -> LatencyHistogram:
+        oldest_kept = now - self.slice_s * self.slices
+        self._slices = [(start, hist) for start, hist in self._slices if start > oldest_kept]
+        if not self._slices or now - self._slices[-1][0] >= self.slice_s:
+            self._slices.append((now, LatencyHistogram(self.sub_bucket_bits)))
+        return self._slices[-1][1]
+
+    def record(self, value_ns: int, now: Optional[float] = None) -> None:
+        self._rotate(time.monotonic() if now is None else now).record(value_ns)
+
+    def merged(self, now: Optional[float] = None) -> LatencyHistogram:
+        self._rotate(time.monotonic() if now is None else now)
+        merged = LatencyHistogram(self.sub_bucket_bits)
+        for _, hist in self._slices:
+            merged.merge(hist)
+        return merged
+
+
+@dataclass
+class PendingDecision:
+    action: str
+    input_ns: int
+    verdict_ns: int
+    chosen_ns: int
+
+
+class DecisionLatencyTracker:
+    """Collects input -> verdict -> chosen -> visible latencies per annoyed action."""
+
+    def __init__(self, window_s: float = 600.0, expire_s: float = 30.0) -> None:
+        self.window_s = window_s
+        self.expire_s = expire_s
+        self._lock = threading.Lock()
+        self._pending: dict[str, PendingDecision] = {}
+        self._histograms: dict[tuple[str, str, str], RollingLatencyHistogram] = {}
+        self.completed = 0
+        self.abandoned = 0
+
+    def begin(self, action: str, input_ns: int, verdict_ns: int, chosen_ns: Optional[int] = None) -> None:
+        """check_slacking picked `action`; the action reports visible() when it shows."""
+        chosen = time.monotonic_ns() if chosen_ns is None else chosen_ns
+        with self._lock:
+            if action in self._pending:
+                self.abandoned += 1
+            self._pending[action] = PendingDecision(action, min(input_ns, verdict_ns), verdict_ns, chosen)
+
+    def visible(self, action: str, visible_ns: Optional[int] = None) -> None:
+        """Close the pending decision for action. No-op when none is pending."""
+        if action not in self._pending:
+            return
+        now_ns = time.monotonic_ns() if visible_ns is None else visible_ns
+        with self._lock:
+            decision = self._pending.pop(action, None)
+            if decision is None:
+                return
+            if now_ns - decision.chosen_ns > self.expire_s * 1e9:
+                #  The action never showed (e.g. no window found); don't skew the histograms.
+                self.abandoned += 1
+                return
+            stages = {
+                "input": decision.input_ns,
+                "verdict": decision.verdict_ns,
+                "chosen": decision.chosen_ns,
+                "visible": now_ns,
+            }
+            for start, end in SEGMENTS:
+                key = (action, start, end)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = RollingLatencyHistogram(self.window_s)
+                histogram.record(stages[end] - stages[start])
+            self.completed += 1
+
+    def cancel(self, action: str) -> None:
+        with self._lock:
+            if self._pending.pop(action, None) is not None:
+                self.abandoned += 1
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, float]]]:
+        """{action: {"input->visible": {count, p50_ms, p90_ms, p99_ms, max_ms}, ...}}"""
+        report: dict[str, dict[str, dict[str, float]]] = {}
+        with self._lock:
+            items = list(self._histograms.items())
+        for (action, start, end), rolling in items:
+            histogram = rolling.merged()
+            if not histogram.total:
+                continue
+            report.setdefault(action, {})[f"{start}->{end}"] = {
+                "count": histogram.total,
+                "p50_ms": histogram.percentile(50) / 1e6,
+                "p90_ms": histogram.percentile(90) / 1e6,
+                "p99_ms": histogram.percentile(99) / 1e6,
+                "max_ms": histogram.max_ns / 1e6,
+            }
+        return report
+
+    def summary_lines(self) -> list[str]:
+        """One line per action for the debug label: end-to-end p50/p99 and the slowest stage."""
+        lines = []
+        for action, segments in sorted(self.snapshot().items()):
+            total = segments.get("input->visible")
+            if total is None:
+                continue
+            stages = [
+                f"{name.split('->')[1]} {values['p50_ms']:.0f}/{values['p99_ms']:.0f}"
+                for name, values in segments.items()
+                if name != "input->visible"
+            ]
+            lines.append(
+                f"{action} n={total['count']} e2e p50={total['p50_ms']:.0f}ms "
+                f"p99={total['p99_ms']:.0f}ms ({', '.join(stages)})"
+            )
+        return lines
+
+
+_tracker: Optional[DecisionLatencyTracker] = None
+
+
+def get_latency_tracker() -> DecisionLatencyTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = DecisionLatencyTracker()
+    return _tracker
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Optional, Pattern, Sequence
+
+from CONFIG import SLACKING_APPS, SLACKING_TITLE_KEYWORDS, SLACKING_WHOLE_WORD_KEYWORDS
+
+
+class SlackingMatcher:
+    """Slacking app/title matcher compiled once into two alternation regexes.
+
+    Keywords listed in whole_word_keywords only match as a separate word, so
+    "x" matches "Home / X" but not "Xbox" or "Firefox". Verdicts are memoized
+    per (app, title) since the same few windows are checked over and over.
+    """
+
+    def __init__(
+        self,
+        apps: Sequence[str],
+        title_keywords: Sequence[str],
+        whole_word_keywords: Sequence[str] = (),
+        cache_size: int = 1024,
+    ) -> None:
+        whole_words = {keyword.casefold() for keyword in whole_word_keywords if keyword}
+        self._app_pattern = _compile_keywords(apps, whole_words)
+        self._title_pattern = _compile_keywords(title_keywords, whole_words)
+        self.matches = lru_cache(maxsize=cache_size)(self._matches)
+
+    def app_matches(self, app_name: Optional[str]) -> bool:
+        return _search(self._app_pattern, app_name)
+
+    def title_matches(self, window_title: Optional[str]) -> bool:
+        return _search(self._title_pattern, window_title)
+
+    def _matches(self, app_name: Optional[str], window_title: Optional[str]) -> bool:
+        return self.app_matches(app_name) or self.title_matches(window_title)
+
+
+def _compile_keywords(keywords: Sequence[str], whole_words: set[str]) -> Optional[Pattern[str]]:
+    folded = sorted({keyword.casefold() for keyword in keywords if keyword}, key=len, reverse=True)
+    if not folded:
+        return None
+    alternatives = [
+        rf"(?<!\w){re.escape(keyword)}(?!\w)" if keyword in whole_words else re.escape(keyword)
+        for keyword in folded
+    ]
+    return re.compile("|".join(alternatives))
+
+
+def _search(pattern: Optional[Pattern[str]], text: Optional[str]) -> bool:
+    if pattern is None or not text:
+        return False
+    return pattern.search(text.casefold()) is not None
+
+
+_matchers: dict[tuple[str, ...], SlackingMatcher] = {}
+
+
+def get_slacking_matcher(title_keywords: Optional[Sequence[str]] = None) -> SlackingMatcher:
+    """Shared matcher for SLACKING_APPS plus title_keywords (SLACKING_TITLE_KEYWORDS by default)."""
+    key = tuple(SLACKING_TITLE_KEYWORDS if title_keywords is None else title_keywords)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = SlackingMatcher(SLACKING_APPS, key, SLACKING_WHOLE_WORD_KEYWORDS)
+        _matchers[key] = matcher
+    return matcher
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Iterable, Optional, Tuple
+
+
+class PeriodicityTracker:
+    """Streaming version of _is_periodic for one input stream.
+
+    Keeps the last (min_events - 1) intervals with a running sum and monotonic
+    min/max deques, so every event updates the verdict in O(1) and detectors
+    only read `periodic`. Timestamps are time.monotonic_ns() ints, so the
+    running sum is exact; thresholds stay in seconds.
+    """
+
+    def __init__(
+        self,
+        min_events: int = 4,
+        min_period_s: float = 0.0,
+        max_period_s: float = float("inf"),
+        max_jitter_ratio: float = 1.0,
+    ) -> None:
+        self.params: Tuple[int, float, float, float] = (
+            min_events,
+            min_period_s,
+            max_period_s,
+            max_jitter_ratio,
+        )
+        self.periodic = False
+        self._last: Optional[int] = None
+        self._count = 0
+        self._intervals: Deque[Tuple[int, int]] = deque()
+        self._max: Deque[Tuple[int, int]] = deque()
+        self._min: Deque[Tuple[int, int]] = deque()
+        self._sum = 0
+        self._non_positive = 0
+
+    def clear(self) -> None:
+        self.periodic = False
+        self._last = None
+        self._intervals.clear()
+        self._max.clear()
+        self._min.clear()
+        self._sum = 0
+        self._non_positive = 0
+
+    def configure(
+        self,
+        min_events: int,
+        min_period_s: float,
+        max_period_s: float,
+        max_jitter_ratio: float,
+        timestamps: Iterable[int] = (),
+    ) -> None:
+        """Change thresholds and rebuild the window from recent timestamps."""
+        self.params = (min_events, min_period_s, max_period_s, max_jitter_ratio)
+        self.clear()
+        for timestamp in list(timestamps)[-min_events:]:
+            self.add(timestamp)
+
+    def verdict(
+        self,
+        min_events: int,
+        min_period_s: float,
+        max_period_s: float,
+        max_jitter_ratio: float,
+        timestamps: Iterable[int] = (),
+    ) -> bool:
+        if self.params != (min_events, min_period_s, max_period_s, max_jitter_ratio):
+            self.configure(min_events, min_period_s, max_period_s, max_jitter_ratio, timestamps)
+        return self.periodic
+
+    def add(self, timestamp: int) -> bool:
+        last = self._last
+        self._last = timestamp
+        if last is None:
+            return self.periodic
+        interval = timestamp - last
+        index = self._count
+        self._count += 1
+
+        self._intervals.append((index, interval))
+        self._sum += interval
+        if interval <= 0:
+            self._non_positive += 1
+        while self._max and self._max[-1][1] <= interval:
+            self._max.pop()
+        self._max.append((index, interval))
+        while self._min and self._min[-1][1] >= interval:
+            self._min.pop()
+        self._min.append((index, interval))
+
+        window = max(1, self.params[0] - 1)
+        while len(self._intervals) > window:
+            old_index, old_interval = self._intervals.popleft()
+            self._sum -= old_interval
+            if old_interval <= 0:
+                self._non_positive -= 1
+            if self._max[0][0] == old_index:
+                self._max.popleft()
+            if self._min[0][0] == old_index:
+                self._min.popleft()
+
+        self.periodic = self._evaluate(window)
+        return self.periodic
+
+    def _evaluate(self, window: int) -> bool:
+        min_events, min_period_s, max_period_s, max_jitter_ratio = self.params
+        if min_events < 2 or len(self._intervals) < window or self._non_positive:
+            return False
+        mean_interval = self._sum / window / 1e9
+        if mean_interval <= 0:
+            return False
+        if mean_interval < min_period_s or mean_interval > max_period_s:
+            return False
+        max_deviation = max(
+            self._max[0][1] / 1e9 - mean_interval,
+            mean_interval - self._min[0][1] / 1e9,
+        )
+        return max_deviation <= (mean_interval * max_jitter_ratio)
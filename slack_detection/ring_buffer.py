@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import operator
+from array import array
+from typing import Iterator
+
+
+class TimestampRing:
+    """Fixed-capacity ring of int64 timestamps (time.monotonic_ns()).
+
+    Every value is written twice, at i and i + capacity, so the newest n entries
+    are always one contiguous slice and last(n) can hand out a zero-copy
+    memoryview without unwrapping the ring.
+    """
+
+    __slots__ = ("capacity", "_data", "_head", "_len")
+
+    def __init__(self, capacity: int = 120) -> None:
+        self.capacity = max(1, int(capacity))
+        self._data = array("q", bytes(8 * 2 * self.capacity))
+        self._head = 0
+        self._len = 0
+
+    def append(self, timestamp_ns: int) -> None:
+        head = self._head
+        self._data[head] = timestamp_ns
+        self._data[head + self.capacity] = timestamp_ns
+        self._head = (head + 1) % self.capacity
+        if self._len < self.capacity:
+            self._len += 1
+
+    def clear(self) -> None:
+        self._head = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.last(self._len))
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("TimestampRing index out of range")
+        return self._data[self._head + self.capacity - self._len + index]
+
+    def last(self, n: int) -> memoryview:
+        """Zero-copy view of the newest n timestamps, oldest first."""
+        n = max(0, min(n, self._len))
+        end = self._head + self.capacity
+        return memoryview(self._data)[end - n:end]
+
+    def intervals(self, n: int) -> list[int]:
+        """Gaps in ns between the newest n timestamps (n - 1 values)."""
+        view = self.last(n)
+        return list(map(operator.sub, view[1:], view[:-1]))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Optional
+
+from PyQt5 import QtCore
+
+
+class SlackCheckScheduler(QtCore.QObject):
+    """Runs the slack check only when a detector verdict could change.
+
+    next_deadline returns the earliest future time (time.monotonic() seconds) at
+    which a time-based detector flips, or None. A single-shot timer is armed for
+    it, capped by max_interval_s. wake() re-evaluates soon after an input or
+    window-change event and may be called from any thread.
+    """
+
+    _wake_requested = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        check: Callable[[], None],
+        next_deadline: Callable[[], Optional[float]],
+        parent: Optional[QtCore.QObject] = None,
+        min_interval_s: float = 0.02,
+        max_interval_s: float = 20.0,
+    ) -> None:
+        super().__init__(parent)
+        self._check = check
+        self._next_deadline = next_deadline
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max_interval_s
+        self.wakeups = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.timeout.connect(self._run)
+        #  Queued across threads, so global input/X watcher threads can wake us.
+        self._wake_requested.connect(self._wake_soon)
+
+    def start(self) -> None:
+        self._wake_soon()
+
+    def stop(self) -> None:
+        self._timer.stop()
+
+    def wake(self) -> None:
+        self._wake_requested.emit()
+
+    def _wake_soon(self) -> None:
+        #  Bursts of events collapse into one evaluation per min_interval_s.
+        delay_ms = int(self.min_interval_s * 1000)
+        if self._timer.isActive() and self._timer.remainingTime() <= delay_ms:
+            return
+        self._timer.start(delay_ms)
+
+    def _run(self) -> None:
+        self.wakeups += 1
+        self._check()
+        self._arm()
+
+    def _arm(self) -> None:
+        delay_s = self.max_interval_s
+        deadline = self._next_deadline()
+        if deadline is not None:
+            delay_s = min(delay_s, deadline - time.monotonic())
+        delay_s = max(self.min_interval_s, delay_s)
+        if self._timer.isActive() and self._timer.remainingTime() <= delay_s * 1000:
+            return
+        self._timer.start(int(math.ceil(delay_s * 1000)))
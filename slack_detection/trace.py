@@ -0,0 +1,246 @@
+"""Binary input traces: record real sessions, replay them through the detectors offline.
+
+Usage:
+    python -m slack_detection.trace replay session.nbt --reels 4 --time-per-reel 3.6
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from CONFIG import *
+from . import SlackDetectionState
+from .context import DetectionContext, DetectionThresholds, run_detectors
+from .input_recording import (
+    record_keypress,
+    record_mouse_click,
+    record_mouse_move,
+    record_mouse_scroll,
+    reset_periodic_input,
+)
+
+#  File layout: 16-byte header, then 16-byte records (int64 monotonic ns, uint8 kind,
+#  3 pad bytes, uint32 payload length). Window records are followed by their
+#  "app\0title" UTF-8 payload padded to 8 bytes, so the file can be mmapped and
+#  walked with struct.unpack_from without copying.
+TRACE_MAGIC = b"NBTRACE1"
+_HEADER = struct.Struct("<8sq")
+_RECORD = struct.Struct("<qB3xI")
+
+KIND_CLICK = 1
+KIND_SCROLL = 2
+KIND_KEY = 3
+KIND_MOVE = 4
+KIND_WINDOW = 5
+
+_KIND_BY_NAME = {"click": KIND_CLICK, "scroll": KIND_SCROLL, "key": KIND_KEY, "move": KIND_MOVE}
+
+
+@dataclass
+class TraceEvent:
+    timestamp_ns: int
+    kind: int
+    app_name: Optional[str] = None
+    title: Optional[str] = None
+
+
+class TraceRecorder:
+    """Appends every recorded input event and active-window change to a binary trace."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = open(self.path, "wb")
+        #  Wall-clock start time, only informational; records use the monotonic clock.
+        self._file.write(_HEADER.pack(TRACE_MAGIC, time.time_ns()))
+        self.events = 0
+
+    def attach(self, state: SlackDetectionState) -> None:
+        state.activity_listeners.append(self.record_input)
+
+    def record_input(self, kind: str, timestamp_ns: int) -> None:
+        code = _KIND_BY_NAME.get(kind)
+        if code is not None:
+            self._write(_RECORD.pack(timestamp_ns, code, 0))
+
+    def record_window(
+        self,
+        app_name: Optional[str],
+        title: Optional[str],
+        timestamp_ns: Optional[int] = None,
+    ) -> None:
+        now = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        payload = f"{app_name or ''}\0{title or ''}".encode("utf-8")
+        padding = b"\0" * (-len(payload) % 8)
+        self._write(_RECORD.pack(now, KIND_WINDOW, len(payload)) + payload + padding)
+
+    def _write(self, data: bytes) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self.events += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def iter_trace(path: str | Path) -> Iterator[TraceEvent]:
+    with open(path, "rb") as handle:
+        if Path(path).stat().st_size < _HEADER.size:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, _ = _HEADER.unpack_from(data, 0)
+            if magic != TRACE_MAGIC:
+                raise ValueError(f"{path} is not a Nibbles input trace")
+            offset = _HEADER.size
+            end = len(data) - _RECORD.size
+            while offset <= end:
+                timestamp_ns, kind, length = _RECORD.unpack_from(data, offset)
+                offset += _RECORD.size
+                if kind != KIND_WINDOW:
+                    yield TraceEvent(timestamp_ns, kind)
+                    continue
+                payload = bytes(data[offset:offset + length]).decode("utf-8", errors="replace")
+                offset += length + (-length % 8)
+                app_name, _, title = payload.partition("\0")
+                yield TraceEvent(timestamp_ns, kind, app_name or None, title or None)
+
+
+@dataclass(frozen=True)
+class ReplayParams(DetectionThresholds):
+    max_interval_s: float = 20.0  # same cap as the live SlackCheckScheduler
+    action_cooldown_s: float = SLACK_ACTION_COOLDOWN
+
+
+@dataclass
+class ReplayResult:
+    events: int = 0
+    evaluations: int = 0
+    duration_s: float = 0.0
+    #  (seconds since trace start, "scrolling" | "idle" | "window slack")
+    firings: list[tuple[float, str]] = field(default_factory=list)
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for _, reason in self.firings:
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+
+def replay_trace(path: str | Path, params: Optional[ReplayParams] = None) -> ReplayResult:
+    """Feed a trace through the detectors on a virtual clock, like check_slacking would see it.
+
+    Evaluations happen where the live scheduler would wake: after clicks,
+    scrolls and window changes, at the next idle/window-slack deadline, and at
+    least every max_interval_s. While a verdict stays true it fires again
+    action_cooldown_s after the previous firing, like Nibbles.check_slacking.
+    """
+    params = params or ReplayParams()
+    result = ReplayResult()
+    state: Optional[SlackDetectionState] = None
+    start_s = 0.0
+    now_s = 0.0
+    fired_at_s = float("-inf")
+
+    def evaluate(at_s: float) -> None:
+        nonlocal fired_at_s
+        result.evaluations += 1
+        verdicts = run_detectors(DetectionContext(state, now=at_s, thresholds=params))
+        scrolling, idle, window_slack = verdicts["scrolling"], verdicts["idle"], verdicts["window_slack"]
+        if not (scrolling or idle or window_slack) or at_s - fired_at_s < params.action_cooldown_s:
+            return
+        fired_at_s = at_s
+        reason = "scrolling" if scrolling else "idle" if idle else "window slack"
+        result.firings.append((at_s - start_s, reason))
+        reset_periodic_input(state)
+        state.last_input_time = 0
+
+    def next_wakeup(after_s: float) -> float:
+        cooldown_until = fired_at_s + params.action_cooldown_s
+        verdict_at = [state.last_input_time + params.daydreaming_threshold]
+        if DetectionContext(state, now=after_s, thresholds=params).active_window_slacking:
+            verdict_at.append(state.active_window_started_at + params.slacking_threshold)
+        deadlines = [max(at, cooldown_until) for at in verdict_at] + [cooldown_until]
+        return min([after_s + params.max_interval_s] + [at for at in deadlines if at > after_s])
+
+    for event in iter_trace(path):
+        event_s = event.timestamp_ns / 1e9
+        if state is None:
+            start_s = now_s = event_s
+            state = SlackDetectionState(last_input_time=event_s, active_window_started_at=event_s)
+            state.watched_active_window = ("", "", event_s)
+        #  Time-based wakeups between the previous event and this one
+        wake_s = next_wakeup(now_s)
+        while wake_s < event_s:
+            evaluate(wake_s)
+            now_s = wake_s
+            wake_s = next_wakeup(now_s)
+        now_s = event_s
+        result.events += 1
+
+        if event.kind == KIND_CLICK:
+            record_mouse_click(state, event.timestamp_ns)
+        elif event.kind == KIND_SCROLL:
+            record_mouse_scroll(state, event.timestamp_ns)
+        elif event.kind == KIND_KEY:
+            record_keypress(state, event.timestamp_ns)
+            continue
+        elif event.kind == KIND_MOVE:
+            record_mouse_move(state, event.timestamp_ns)
+            continue
+        elif event.kind == KIND_WINDOW:
+            state.watched_active_window = (event.app_name, event.title, event_s)
+        evaluate(event_s)
+
+    result.duration_s = now_s - start_s
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    defaults = ReplayParams()
+    parser = argparse.ArgumentParser(description="Replay Nibbles input traces through slack detection.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    replay = subparsers.add_parser("replay", help="re-score one or more traces")
+    replay.add_argument("traces", nargs="+")
+    replay.add_argument("--reels", type=int, default=defaults.reels_scrolled)
+    replay.add_argument("--min-period", type=float, default=defaults.min_period_s)
+    replay.add_argument("--time-per-reel", type=float, default=TIME_PER_REEL)
+    replay.add_argument("--deviation", type=float, default=TIME_PER_REEL_DEVIATION)
+    replay.add_argument("--jitter", type=float, default=defaults.max_jitter_ratio)
+    replay.add_argument("--daydreaming", type=float, default=defaults.daydreaming_threshold)
+    replay.add_argument("--slacking", type=float, default=defaults.slacking_threshold)
+    args = parser.parse_args(argv)
+
+    params = ReplayParams(
+        reels_scrolled=args.reels,
+        min_period_s=args.min_period,
+        max_period_s=args.time_per_reel + args.deviation,
+        max_jitter_ratio=args.jitter,
+        daydreaming_threshold=args.daydreaming,
+        slacking_threshold=args.slacking,
+    )
+    for trace in args.traces:
+        started = time.perf_counter()
+        result = replay_trace(trace, params)
+        elapsed = time.perf_counter() - started
+        speedup = result.duration_s / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{trace}: {result.events} events over {result.duration_s:.0f}s, "
+            f"{result.evaluations} evaluations, fired {result.counts()} "
+            f"(replayed in {elapsed:.2f}s, {speedup:.0f}x real time)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
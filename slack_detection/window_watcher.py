@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import platform
+import select
+import threading
+import time
+from typing import Callable, Optional
+
+from . import SlackDetectionState
+from .x11 import X11_PLATFORMS
+from .xprop_spy import start_xprop_window_watcher
+
+
+def start_active_window_watcher(
+    state: SlackDetectionState,
+    on_change: Optional[Callable[[], None]] = None,
+) -> Optional[Callable[[], None]]:
+    """Start a Linux-only active-window watcher. Returns a stop callback or None.
+
+    Instead of polling, the watcher listens for PropertyNotify on the root window's
+    _NET_ACTIVE_WINDOW and on the focused window's title, and pushes
+    (app, title, since) into state.watched_active_window as changes happen.
+    on_change is called from the watcher thread whenever focus, a title or the
+    client list changes (used to invalidate the window registry).
+    """
+    if platform.system().lower() not in X11_PLATFORMS:
+        state.window_watcher_status = "unsupported"
+        return None
+
+    try:
+        from Xlib import X, display  # type: ignore
+    except Exception:
+        #  Locked-down images without python-xlib: stream from `xprop -spy` instead.
+        return start_xprop_window_watcher(state, on_change)
+
+    try:
+        conn = display.Display()
+    except Exception:
+        state.window_watcher_status = "no display"
+        return None
+
+    stop_event = threading.Event()
+    root = conn.screen().root
+    net_active_window = conn.intern_atom("_NET_ACTIVE_WINDOW")
+    net_client_list = conn.intern_atom("_NET_CLIENT_LIST")
+    net_wm_name = conn.intern_atom("_NET_WM_NAME")
+    title_atoms = {net_wm_name, conn.intern_atom("WM_NAME"), conn.intern_atom("WM_CLASS")}
+    utf8_string = conn.intern_atom("UTF8_STRING")
+    focused: dict[str, object] = {"window": None}
+    state.window_watcher_status = "starting"
+
+    def read_title(window) -> Optional[str]:
+        prop = window.get_full_property(net_wm_name, utf8_string)
+        if prop is None or not prop.value:
+            name = window.get_wm_name()
+            if isinstance(name, bytes):
+                name = name.decode("latin-1", errors="replace")
+            return name or None
+        value = prop.value
+        if isinstance(value, bytes):
+            value = value.decode("utf-8", errors="replace")
+        return value or None
+
+    def read_app(window) -> Optional[str]:
+        wm_class = window.get_wm_class()
+        if not wm_class:
+            return None
+        return wm_class[-1] or None
+
+    def push(window) -> None:
+        app_name: Optional[str] = None
+        title: Optional[str] = None
+        if window is not None:
+            try:
+                app_name = read_app(window)
+                title = read_title(window)
+            except Exception:
+                #  Focused window disappeared before we could read it.
+                app_name, title = None, None
+        previous = state.watched_active_window
+        if previous is not None and previous[0] == app_name and previous[1] == title:
+            return
+        #  Single tuple assignment so the GUI thread never sees a half-updated window.
+        state.watched_active_window = (app_name, title, time.monotonic())
+        notify()
+
+    def notify() -> None:
+        if on_change is None:
+            return
+        try:
+            on_change()
+        except Exception:
+            pass
+
+    def refocus() -> None:
+        old = focused["window"]
+        if old is not None:
+            try:
+                old.change_attributes(event_mask=X.NoEventMask)
+            except Exception:
+                pass
+        prop = root.get_full_property(net_active_window, X.AnyPropertyType)
+        window_id = int(prop.value[0]) if prop is not None and prop.value else 0
+        window = conn.create_resource_object("window", window_id) if window_id else None
+        if window is not None:
+            try:
+                window.change_attributes(event_mask=X.PropertyChangeMask)
+            except Exception:
+                window = None
+        focused["window"] = window
+        push(window)
+
+    def _run_loop() -> None:
+        try:
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+            refocus()
+            conn.flush()
+        except Exception:
+            state.window_watcher_status = "failed"
+            return
+        state.window_watcher_status = "active"
+        fd = conn.fileno()
+        while not stop_event.is_set():
+            try:
+                readable, _, _ = select.select([fd], [], [], 0.5)
+                if not readable:
+                    continue
+                for _ in range(conn.pending_events()):
+                    event = conn.next_event()
+                    if event.type != X.PropertyNotify:
+                        continue
+                    if event.window.id == root.id:
+                        if event.atom == net_active_window:
+                            refocus()
+                        elif event.atom == net_client_list:
+                            notify()
+                    elif event.atom in title_atoms:
+                        window = focused["window"]
+                        if window is not None and event.window.id == window.id:
+                            push(window)
+                conn.flush()
+            except Exception:
+                if stop_event.is_set():
+                    break
+                state.window_watcher_status = "failed"
+                state.watched_active_window = None
+                return
+        state.window_watcher_status = "stopped"
+        state.watched_active_window = None
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=_run_loop, name="ActiveWindowWatcher", daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        stop_event.set()
+
+    return stop
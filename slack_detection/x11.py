@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional, Tuple
+
+#  platform.system().lower() values where the desktop runs on X11
+X11_PLATFORMS = ("linux", "freebsd", "openbsd")
+
+#  Persistent X11 connection shared by detection, utils and annoyed_actions.
+#  Every query goes over one long-lived socket instead of forking xprop/xwininfo.
+_connection: Optional["X11Connection"] = None
+#  Missing python-xlib is permanent; a failed connect (X not up yet) is retried with backoff
+_xlib_missing: bool = False
+_retry_at: float = 0.0
+_retry_delay_s: float = 1.0
+_MAX_RETRY_DELAY_S = 60.0
+_connection_lock = threading.Lock()
+
+
+class X11Connection:
+    """Long-lived Xlib display used to read EWMH window properties."""
+
+    def __init__(self, display_name: Optional[str] = None) -> None:
+        from Xlib import X, display  # type: ignore
+
+        self._X = X
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        self._lock = threading.RLock()
+        self._atoms: dict[str, int] = {}
+
+    def atom(self, name: str) -> int:
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self.display.intern_atom(name)
+            self._atoms[name] = atom
+        return atom
+
+    def window(self, window_id: int):
+        return self.display.create_resource_object("window", window_id)
+
+    def active_window_id(self) -> Optional[int]:
+        with self._lock:
+            prop = self.root.get_full_property(
+                self.atom("_NET_ACTIVE_WINDOW"), self._X.AnyPropertyType
+            )
+        if prop is None or not prop.value:
+            return None
+        window_id = int(prop.value[0])
+        return window_id or None
+
+    def client_list(self) -> list[int]:
+        with self._lock:
+            prop = self.root.get_full_property(
+                self.atom("_NET_CLIENT_LIST"), self._X.AnyPropertyType
+            )
+        if prop is None:
+            return []
+        return [int(window_id) for window_id in prop.value]
+
+    def window_title(self, window_id: int) -> Optional[str]:
+        with self._lock:
+            window = self.window(window_id)
+            prop = window.get_full_property(
+                self.atom("_NET_WM_NAME"), self.atom("UTF8_STRING")
+            )
+            if prop is not None and prop.value:
+                return _decode(prop.value, "utf-8")
+            prop = window.get_full_property(self.atom("WM_NAME"), self._X.AnyPropertyType)
+        if prop is None or not prop.value:
+            return None
+        return _decode(prop.value, "latin-1")
+
+    def window_class(self, window_id: int) -> Optional[str]:
+        """Return the class part of WM_CLASS, matching xprop's prefer_last parse."""
+        with self._lock:
+            wm_class = self.window(window_id).get_wm_class()
+        if not wm_class:
+            return None
+        return wm_class[-1] or None
+
+    def window_geometry(self, window_id: int) -> Optional[Tuple[int, int, int, int]]:
+        """Return (x, y, width, height) in root coordinates, like xwininfo's absolute values."""
+        with self._lock:
+            window = self.window(window_id)
+            geometry = window.get_geometry()
+            origin = self.root.translate_coords(window, 0, 0)
+        if geometry.width <= 0 or geometry.height <= 0:
+            return None
+        return int(origin.x), int(origin.y), int(geometry.width), int(geometry.height)
+
+    def move_resize_window(self, window_id: int, x: int, y: int, width: int, height: int) -> None:
+        """Ask the window manager to move/resize a client via EWMH _NET_MOVERESIZE_WINDOW."""
+        from Xlib.protocol import event  # type: ignore
+
+        #  StaticGravity (10) so x/y address the client window itself, flags for
+        #  x, y, width and height, source indication 2 (pager) so WMs honour it.
+        flags = 10 | (0xF << 8) | (2 << 12)
+        with self._lock:
+            message = event.ClientMessage(
+                window=self.window(window_id),
+                client_type=self.atom("_NET_MOVERESIZE_WINDOW"),
+                data=(32, [flags, x, y, width, height]),
+            )
+            self.root.send_event(
+                message,
+                event_mask=self._X.SubstructureRedirectMask | self._X.SubstructureNotifyMask,
+            )
+            #  Round-trip so the caller knows the request reached the server.
+            self.display.sync()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.display.close()
+            except Exception:
+                pass
+
+
+def _decode(value, encoding: str) -> Optional[str]:
+    if isinstance(value, str):
+        return value or None
+    text = bytes(value).decode(encoding, errors="replace").rstrip("\x00")
+    return text or None
+
+
+def get_x11_connection() -> Optional[X11Connection]:
+    """Return the shared X11 connection, or None when Xlib/X server is unavailable."""
+    global _connection, _xlib_missing, _retry_at, _retry_delay_s
+    if _connection is not None:
+        return _connection
+    if _xlib_missing or time.monotonic() < _retry_at:
+        return None
+    with _connection_lock:
+        if _connection is None and not _xlib_missing and time.monotonic() >= _retry_at:
+            try:
+                _connection = X11Connection()
+                _retry_delay_s = 1.0
+            except ImportError:
+                _xlib_missing = True
+            except Exception:
+                #  No $DISPLAY or X not ready yet: callers use the xprop subprocess path until the retry.
+                _retry_at = time.monotonic() + _retry_delay_s
+                _retry_delay_s = min(_MAX_RETRY_DELAY_S, _retry_delay_s * 2)
+    return _connection
+
+
+def reset_x11_connection() -> None:
+    """Drop the shared connection so the next query reconnects (e.g. after the X server restarts)."""
+    global _connection
+    with _connection_lock:
+        if _connection is not None:
+            _connection.close()
+        _connection = None
+
+
+def query_active_window() -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Return (app, title) of the focused window, or None if the X11 backend can't answer."""
+    connection = get_x11_connection()
+    if connection is None:
+        return None
+    try:
+        window_id = connection.active_window_id()
+        if window_id is None:
+            return None, None
+        return connection.window_class(window_id), connection.window_title(window_id)
+    except Exception:
+        reset_x11_connection()
+        return None
+
+
+def query_client_windows(
+    with_geometry: bool = False,
+) -> Optional[list[Tuple[str, Optional[str], Optional[str], Optional[Tuple[int, int, int, int]]]]]:
+    """Return (window_id, app, title, geometry) for every _NET_CLIENT_LIST window, or None on failure.
+
+    Window ids are formatted like xprop prints them so both paths share one id space.
+    """
+    connection = get_x11_connection()
+    if connection is None:
+        return None
+    try:
+        window_ids = connection.client_list()
+    except Exception:
+        reset_x11_connection()
+        return None
+    windows = []
+    for window_id in window_ids:
+        try:
+            title = connection.window_title(window_id)
+            app_name = connection.window_class(window_id)
+            geometry = connection.window_geometry(window_id) if with_geometry else None
+        except Exception:
+            #  Window vanished between listing and querying it.
+            continue
+        windows.append((hex(window_id), app_name, title, geometry))
+    return windows
+
+
+def query_window_geometry(window_id: str) -> Optional[Tuple[int, int, int, int]]:
+    connection = get_x11_connection()
+    if connection is None:
+        return None
+    try:
+        return connection.window_geometry(int(window_id, 16))
+    except Exception:
+        return None
+
+
+def move_resize_window(window_id: str, x: int, y: int, width: int, height: int) -> bool:
+    connection = get_x11_connection()
+    if connection is None:
+        return False
+    try:
+        connection.move_resize_window(int(window_id, 16), x, y, width, height)
+    except Exception:
+        return False
+    return True
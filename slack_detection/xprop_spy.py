@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+from . import SlackDetectionState, _parse_xprop_value
+
+_WINDOW_ID_RE = re.compile(r"window id # (0x[0-9a-fA-F]+)")
+_TITLE_PROPS = ("_NET_WM_NAME", "WM_NAME", "WM_CLASS")
+
+
+def start_xprop_window_watcher(
+    state: SlackDetectionState,
+    on_change: Optional[Callable[[], None]] = None,
+    max_backoff_s: float = 30.0,
+    probe_timeout_s: float = 1.0,
+) -> Optional[Callable[[], None]]:
+    """Watch the active window through long-lived `xprop -spy` children. Returns a stop callback.
+
+    Fallback for machines without python-xlib: one child spies on the root
+    window's _NET_ACTIVE_WINDOW and one more on the focused window's title and
+    class. Their stdout is parsed line by line on reader threads and pushed into
+    state.watched_active_window. Both children are restarted if they die.
+    """
+    try:
+        probe = subprocess.run(
+            ["xprop", "-root", "_NET_ACTIVE_WINDOW"],
+            capture_output=True,
+            check=False,
+            timeout=probe_timeout_s,
+        )
+    except FileNotFoundError:
+        state.window_watcher_status = "missing xprop"
+        return None
+    except subprocess.TimeoutExpired:
+        #  Runs during startup: a wedged X server must not hang Nibbles
+        state.window_watcher_status = "no display"
+        return None
+    if probe.returncode != 0:
+        state.window_watcher_status = "no display"
+        return None
+
+    stop_event = threading.Event()
+    lock = threading.Lock()
+    #  focus counts focus changes, so a title spy can tell it no longer owns the window
+    current: dict[str, object] = {"window_id": None, "focus": 0, "spy": None, "root": None}
+    props: dict[str, Optional[str]] = {}
+
+    def notify() -> None:
+        if on_change is None:
+            return
+        try:
+            on_change()
+        except Exception:
+            pass
+
+    def push() -> None:
+        app_name = props.get("WM_CLASS")
+        title = props.get("_NET_WM_NAME") or props.get("WM_NAME")
+        previous = state.watched_active_window
+        if previous is not None and previous[0] == app_name and previous[1] == title:
+            return
+        state.watched_active_window = (app_name, title, time.monotonic())
+        notify()
+
+    def spawn(args: list[str]) -> Optional[subprocess.Popen]:
+        try:
+            return subprocess.Popen(
+                args,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+        except (FileNotFoundError, OSError):
+            return None
+
+    def kill(child: Optional[subprocess.Popen]) -> None:
+        if child is None or child.poll() is not None:
+            return
+        child.terminate()
+        try:
+            child.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            child.kill()
+
+    def read_window(window_id: str, generation: int) -> None:
+        """Spy on window_id's title and class until focus moves, restarting the spy if it dies."""
+        backoff_s = 1.0
+        while not stop_event.is_set():
+            child = spawn(["xprop", "-spy", "-id", window_id, *_TITLE_PROPS])
+            with lock:
+                focused = current["focus"] == generation
+                if focused:
+                    current["spy"] = child
+            if not focused:
+                kill(child)
+                return
+            if child is None:
+                return
+            started = time.monotonic()
+            for line in child.stdout:
+                if stop_event.is_set():
+                    break
+                name = line.split("(", 1)[0].split(":", 1)[0].strip()
+                if name not in _TITLE_PROPS:
+                    continue
+                with lock:
+                    if current["focus"] != generation:
+                        break
+                    state.window_watcher_events += 1
+                    props[name] = _parse_xprop_value(line, prefer_last=(name == "WM_CLASS"))
+                    #  xprop prints every property once on start; wait for all of them so a
+                    #  half-read window does not reset the time-on-window clock
+                    if all(prop in props for prop in _TITLE_PROPS):
+                        push()
+            kill(child)
+            with lock:
+                if current["focus"] != generation:
+                    return
+                if current["spy"] is child:
+                    current["spy"] = None
+            if stop_event.is_set():
+                return
+            #  The title spy died while the window kept focus: back off and spy again.
+            if time.monotonic() - started > max_backoff_s:
+                backoff_s = 1.0
+            state.window_watcher_restarts += 1
+            stop_event.wait(backoff_s)
+            backoff_s = min(max_backoff_s, backoff_s * 2)
+
+    def focus(window_id: Optional[str]) -> None:
+        with lock:
+            if window_id == current["window_id"]:
+                return
+            #  Swap the old spy out under the lock but terminate it outside: kill() can block
+            stale = current["spy"]
+            current["window_id"] = window_id
+            current["focus"] = generation = current["focus"] + 1
+            current["spy"] = None
+            props.clear()
+            if window_id is None:
+                push()
+        kill(stale)
+        if window_id is not None:
+            threading.Thread(
+                target=read_window,
+                args=(window_id, generation),
+                name="XpropTitleSpy",
+                daemon=True,
+            ).start()
+
+    def _run_loop() -> None:
+        backoff_s = 1.0
+        while not stop_event.is_set():
+            child = spawn(["xprop", "-spy", "-root", "_NET_ACTIVE_WINDOW"])
+            if child is None:
+                state.window_watcher_status = "missing xprop"
+                return
+            current["root"] = child
+            state.window_watcher_status = "active (xprop)"
+            started = time.monotonic()
+            for line in child.stdout:
+                if stop_event.is_set():
+                    break
+                state.window_watcher_events += 1
+                match = _WINDOW_ID_RE.search(line)
+                window_id = match.group(1).lower() if match else None
+                if window_id is not None and int(window_id, 16) == 0:
+                    window_id = None
+                focus(window_id)
+            kill(child)
+            if stop_event.is_set():
+                break
+            #  The spy died (X restart, killed, ...): back off and start a new one.
+            if time.monotonic() - started > max_backoff_s:
+                backoff_s = 1.0
+            state.window_watcher_restarts += 1
+            state.window_watcher_status = "restarting (xprop)"
+            stop_event.wait(backoff_s)
+            backoff_s = min(max_backoff_s, backoff_s * 2)
+        state.window_watcher_status = "stopped"
+        state.watched_active_window = None
+
+    thread = threading.Thread(target=_run_loop, name="XpropActiveWindowSpy", daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        stop_event.set()
+        kill(current["root"])
+        with lock:
+            spy = current["spy"]
+            current["spy"] = None
+        kill(spy)
+
+    return stop
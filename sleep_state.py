@@ -1,4 +1,6 @@
+from dataclasses import dataclass
 from typing import Optional
+import time
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 from pathlib import Path
@@ -8,15 +10,103 @@ from hamster_states import HamsterState
 from slack_detection import set_sleeping
 from utils import play_audio
 
+SLEEP_FPS = 10 #  The sleep animation is never redrawn more often than this
+DEFAULT_FRAME_DELAY_MS = 100 #  For GIF frames without a delay
+
+
+@dataclass
+class SleepAnimation:
+    """Decoded sleep GIF: frames already scaled to device pixels, plus how long each is shown."""
+
+    frames: list[QtGui.QPixmap]
+    delays_ms: list[int]
+    started_at: float = 0.0
+    paused_at: Optional[float] = None
+
+    @property
+    def duration_ms(self) -> int:
+        return sum(self.delays_ms)
+
+    def _elapsed_ms(self, now: float) -> float:
+        if self.paused_at is not None:
+            now = self.paused_at
+        return ((now - self.started_at) * 1000.0) % max(1, self.duration_ms)
+
+    def frame_index(self, now: float) -> int:
+        elapsed = self._elapsed_ms(now)
+        for index, delay in enumerate(self.delays_ms):
+            if elapsed < delay:
+                return index
+            elapsed -= delay
+        return len(self.frames) - 1
+
+    def ms_until_next_frame(self, now: float) -> int:
+        elapsed = self._elapsed_ms(now)
+        for delay in self.delays_ms:
+            if elapsed < delay:
+                return int(delay - elapsed) + 1
+            elapsed -= delay
+        return 1
+
+    def pause(self, now: float) -> None:
+        if self.paused_at is None:
+            self.paused_at = now
+
+    def resume(self, now: float) -> None:
+        """Continue from the frame shown when paused, not from where wall time would be."""
+        if self.paused_at is not None:
+            self.started_at += now - self.paused_at
+            self.paused_at = None
+
+
+#  (path, mtime, DPR) -> (frames, delays); frames survive naps so the GIF is decoded once
+_decoded_frames: dict[tuple, tuple[list[QtGui.QPixmap], list[int]]] = {}
+
+
+def load_sleep_animation(gif_file: Path, device_pixel_ratio: float = 1.0) -> Optional[SleepAnimation]:
+    try:
+        mtime_ns = gif_file.stat().st_mtime_ns
+    except OSError:
+        print(f"sleep: missing {gif_file}")
+        return None
+    key = (str(gif_file), mtime_ns, device_pixel_ratio)
+    decoded = _decoded_frames.get(key)
+    if decoded is None:
+        reader = QtGui.QImageReader(str(gif_file))
+        frames: list[QtGui.QPixmap] = []
+        delays: list[int] = []
+        while reader.canRead():
+            image = reader.read()
+            if image.isNull():
+                break
+            delays.append(reader.nextImageDelay() or DEFAULT_FRAME_DELAY_MS)
+            if device_pixel_ratio != 1.0:
+                image = image.scaled(
+                    int(round(image.width() * device_pixel_ratio)),
+                    int(round(image.height() * device_pixel_ratio)),
+                    QtCore.Qt.IgnoreAspectRatio,
+                    QtCore.Qt.SmoothTransformation,
+                )
+            pixmap = QtGui.QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+            frames.append(pixmap)
+        if not frames:
+            print(f"sleep: could not decode {gif_file}: {reader.errorString()}")
+            return None
+        decoded = _decoded_frames[key] = (frames, delays)
+    return SleepAnimation(list(decoded[0]), list(decoded[1]), started_at=time.monotonic())
+
+
+def sleep_frame(hamster_widget: QtWidgets.QWidget, now: Optional[float] = None) -> Optional[QtGui.QPixmap]:
+    animation = getattr(hamster_widget, "_sleep_animation", None)
+    if animation is None:
+        return None
+    return animation.frames[animation.frame_index(time.monotonic() if now is None else now)]
+
 
 def wake_up(hamster_widget: QtWidgets.QWidget) -> None:
     """Stop the sleep animation and return the hamster to idle."""
-    label = getattr(hamster_widget, "_sleep_label", None)
-    if label is not None:
-        movie = label.movie()
-        if movie is not None:
-            movie.stop()
-        label.hide()
+    setattr(hamster_widget, "_sleep_animation", None)
     if hasattr(hamster_widget, "sleeping"):
         hamster_widget.sleeping = False
     set_sleeping(False)
@@ -25,31 +115,22 @@ def wake_up(hamster_widget: QtWidgets.QWidget) -> None:
     if ham is not None:
         enter_state(ham, HamsterState.IDLE)
     hamster_widget.update()
-    
+
 def sleep(
     hamster_widget: QtWidgets.QWidget,
     gif_path: Optional[str] = None,
-) -> QtGui.QMovie:
+) -> Optional[SleepAnimation]:
+    """Start the sleep animation; the widget paints sleep_frame() from its own animation clock."""
     gif_file = Path(gif_path) if gif_path else Path(__file__).parent / "sprites" / "sleepy.gif"
 
-    label = getattr(hamster_widget, "_sleep_label", None)
-    if label is None:
-        label = QtWidgets.QLabel(hamster_widget)
-        label.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
-        label.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents, True)
-        label.setAlignment(QtCore.Qt.AlignCenter)
-        setattr(hamster_widget, "_sleep_label", label)
-
     play_audio("sound_effects/sleep.mp3")
 
-    movie = QtGui.QMovie(str(gif_file))
-    label.setMovie(movie)
-    label.resize(hamster_widget.size())
-    label.show()
-    movie.start()
+    animation = load_sleep_animation(gif_file, hamster_widget.devicePixelRatioF())
+    setattr(hamster_widget, "_sleep_animation", animation)
 
     if hasattr(hamster_widget, "sleeping"):
         hamster_widget.sleeping = True
     set_sleeping(True)
     print("asleep")
-    return movie
\ No newline at end of file
+    hamster_widget.update()
+    return animation
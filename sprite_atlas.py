@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+from pathlib import Path
+from typing import Optional, Sequence
+
+from PyQt5 import QtCore, QtGui
+
+#  Raw atlas cache: header, JSON index, then the atlas pixels as ARGB32 premultiplied.
+ATLAS_MAGIC = b"NBATLAS1"
+_HEADER = struct.Struct("<8sIIII")  # magic, width, height, bytes per line, index length
+ATLAS_FORMAT = QtGui.QImage.Format_ARGB32_Premultiplied
+ATLAS_PADDING = 2
+
+
+def default_cache_path() -> Optional[Path]:
+    location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+    if not location:
+        return None
+    return Path(location) / "sprites.atlas"
+
+
+def pack_rects(sizes: dict[str, tuple[int, int]]) -> tuple[int, int, dict[str, tuple[int, int, int, int]]]:
+    """Shelf-pack sprite sizes into a roughly square atlas: (width, height, {name: (x, y, w, h)})."""
+    area = sum((w + ATLAS_PADDING) * (h + ATLAS_PADDING) for w, h in sizes.values())
+    atlas_width = max([int(math.ceil(math.sqrt(area)))] + [w + ATLAS_PADDING for w, _ in sizes.values()])
+    rects: dict[str, tuple[int, int, int, int]] = {}
+    x = y = shelf_height = 0
+    for name in sorted(sizes, key=lambda name: sizes[name][1], reverse=True):
+        w, h = sizes[name]
+        if x + w > atlas_width:
+            x = 0
+            y += shelf_height + ATLAS_PADDING
+            shelf_height = 0
+        rects[name] = (x, y, w, h)
+        x += w + ATLAS_PADDING
+        shelf_height = max(shelf_height, h)
+    return atlas_width, y + shelf_height, rects
+
+
+def _source_stamps(assets_dir: Path, names: Sequence[str]) -> Optional[dict[str, list[int]]]:
+    stamps = {}
+    for name in names:
+        try:
+            stat = (assets_dir / name).stat()
+        except OSError:
+            return None
+        stamps[name] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def read_atlas(
+    cache_path: Path,
+    stamps: dict[str, list[int]],
+) -> Optional[tuple[QtGui.QImage, dict[str, tuple[int, int, int, int]]]]:
+    """The cached atlas image and index, or None if missing, corrupt or older than the sprites."""
+    try:
+        data = cache_path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, width, height, bytes_per_line, index_len = _HEADER.unpack_from(data)
+    pixels_at = _HEADER.size + index_len
+    if magic != ATLAS_MAGIC or len(data) != pixels_at + bytes_per_line * height:
+        return None
+    try:
+        index = json.loads(data[_HEADER.size:pixels_at])
+    except ValueError:
+        return None
+    if index.get("sources") != stamps:
+        return None
+    #  copy() detaches the image from `data`, which is freed on return
+    image = QtGui.QImage(data[pixels_at:], width, height, bytes_per_line, ATLAS_FORMAT).copy()
+    return image, {name: tuple(rect) for name, rect in index["rects"].items()}
+
+
+def write_atlas(
+    cache_path: Path,
+    images: dict[str, QtGui.QImage],
+    stamps: dict[str, list[int]],
+) -> None:
+    width, height, rects = pack_rects({name: (image.width(), image.height()) for name, image in images.items()})
+    atlas = QtGui.QImage(width, height, ATLAS_FORMAT)
+    atlas.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(atlas)
+    painter.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+    for name, (x, y, _, _) in rects.items():
+        painter.drawImage(x, y, images[name])
+    painter.end()
+
+    index = json.dumps({"sources": stamps, "rects": rects}).encode()
+    pixels = atlas.constBits().asstring(atlas.sizeInBytes())
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = cache_path.with_name(cache_path.name + ".tmp")
+    with open(partial, "wb") as f:
+        f.write(_HEADER.pack(ATLAS_MAGIC, width, height, atlas.bytesPerLine(), len(index)))
+        f.write(index)
+        f.write(pixels)
+    partial.replace(cache_path)
+
+
+class _DecodeJob(QtCore.QRunnable):
+    def __init__(
+        self,
+        atlas: "SpriteAtlas",
+        names: Sequence[str],
+        decoded: dict[str, QtGui.QImage],
+        stamps: Optional[dict[str, list[int]]],
+    ) -> None:
+        super().__init__()
+        self._atlas = atlas
+        self._names = names
+        self._decoded = decoded
+        self._stamps = stamps
+
+    def run(self) -> None:
+        #  QImage (unlike QPixmap) may be decoded and painted off the GUI thread
+        images = dict(self._decoded)
+        for name in self._names:
+            image = QtGui.QImage(str(self._atlas.assets_dir / name))
+            if image.isNull():
+                self._atlas._failed.emit(name, f"Could not load {self._atlas.assets_dir / name}")
+                continue
+            images[name] = image.convertToFormat(ATLAS_FORMAT)
+            self._atlas._decoded.emit(name, images[name])
+        if self._atlas.cache_path is not None and self._stamps is not None and len(images) == len(self._atlas.names):
+            try:
+                write_atlas(self._atlas.cache_path, images, self._stamps)
+            except OSError as exc:
+                print(f"sprite atlas: could not write cache: {exc}")
+        self._atlas._done.emit()
+
+
+class SpriteAtlas(QtCore.QObject):
+    """Loads the sprite set from one pre-decoded atlas file, or from the PNGs.
+
+    load() returns the first sprite right away. With a valid cache (same
+    source mtimes and sizes) every sprite comes from a single file read and
+    sprite_loaded fires for each one before load() returns. Otherwise only the
+    first PNG is decoded synchronously; the rest decode on a worker thread,
+    arrive through sprite_loaded on the GUI thread, and the atlas is written
+    to the cache for the next start. A missing sprite file raises
+    FileNotFoundError from load(), before anything is shown; a file that exists
+    but fails to decode in the background is reported through sprite_failed
+    (name, message) on the GUI thread.
+    """
+
+    sprite_loaded = QtCore.pyqtSignal(str, object)
+    sprite_failed = QtCore.pyqtSignal(str, str)
+    finished = QtCore.pyqtSignal()
+    _decoded = QtCore.pyqtSignal(str, object)
+    _failed = QtCore.pyqtSignal(str, str)
+    _done = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        assets_dir: Path,
+        names: Sequence[str],
+        cache_path: Optional[Path] = None,
+        parent: Optional[QtCore.QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.assets_dir = Path(assets_dir)
+        self.names = tuple(names)
+        self.cache_path = cache_path
+        self.from_cache = False
+        self._pixmaps: dict[str, QtGui.QPixmap] = {}
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._decoded.connect(self._on_decoded)
+        self._failed.connect(self.sprite_failed)
+        self._done.connect(self.finished)
+
+    def pixmap(self, name: str) -> Optional[QtGui.QPixmap]:
+        return self._pixmaps.get(name)
+
+    def load(self) -> QtGui.QPixmap:
+        """Decode names[0] (from the cache if possible) and start loading the rest."""
+        first = self.names[0]
+        for name in self.names:
+            if not (self.assets_dir / name).is_file():
+                raise FileNotFoundError(f"Could not load {self.assets_dir / name}")
+        stamps = _source_stamps(self.assets_dir, self.names)
+        cached = read_atlas(self.cache_path, stamps) if self.cache_path is not None and stamps else None
+        if cached is not None and set(cached[1]) == set(self.names):
+            image, rects = cached
+            atlas = QtGui.QPixmap.fromImage(image)
+            self.from_cache = True
+            for name in self.names:
+                self._on_decoded(name, None, atlas.copy(*rects[name]))
+            self.finished.emit()
+            return self._pixmaps[first]
+
+        image = QtGui.QImage(str(self.assets_dir / first))
+        if image.isNull():
+            raise FileNotFoundError(f"Could not load {self.assets_dir / first}")
+        image = image.convertToFormat(ATLAS_FORMAT)
+        self._on_decoded(first, image)
+        self._pool.start(_DecodeJob(self, self.names[1:], {first: image}, stamps))
+        return self._pixmaps[first]
+
+    def _on_decoded(
+        self,
+        name: str,
+        image: Optional[QtGui.QImage],
+        pixmap: Optional[QtGui.QPixmap] = None,
+    ) -> None:
+        if pixmap is None:
+            pixmap = QtGui.QPixmap.fromImage(image)
+        self._pixmaps[name] = pixmap
+        self.sprite_loaded.emit(name, pixmap)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from PyQt5 import QtCore, QtGui
+
+#  Quantization steps for cache keys: 1% of scale, 2% of squash, whole degrees of rotation.
+#  Finer changes reuse the nearest pre-scaled pixmap; a wheel notch (8%) always gets its own.
+SCALE_STEP = 0.01
+SQUASH_STEP = 0.02
+MIN_MIP_SIZE = 16
+MAX_CACHED_REGIONS = 64
+
+
+def _quantize(value: float, step: float) -> float:
+    return round(round(value / step) * step, 6)
+
+
+def _pixmap_bytes(pixmap: QtGui.QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+
+def region_from_alpha(pixmap: QtGui.QPixmap) -> QtGui.QRegion:
+    """Pixels with any alpha, in logical coordinates from the pixmap's top-left."""
+    image = pixmap.toImage()
+    dpr = pixmap.devicePixelRatio()
+    if dpr != 1.0:
+        image = image.scaled(
+            int(math.ceil(image.width() / dpr)),
+            int(math.ceil(image.height() / dpr)),
+            QtCore.Qt.IgnoreAspectRatio,
+            QtCore.Qt.SmoothTransformation,
+        )
+    #  Alpha as gray, then mask out pure black: keeps every pixel with alpha > 0,
+    #  so a window shaped by this region never clips anti-aliased edges.
+    alpha = image.convertToFormat(QtGui.QImage.Format_Alpha8)
+    alpha.reinterpretAsFormat(QtGui.QImage.Format_Grayscale8)
+    mask = alpha.convertToFormat(QtGui.QImage.Format_RGB32).createMaskFromColor(
+        QtGui.qRgb(0, 0, 0),
+        QtCore.Qt.MaskOutColor,
+    )
+    return QtGui.QRegion(QtGui.QBitmap.fromImage(mask))
+
+
+class SpriteCache:
+    """Pre-scaled sprite pixmaps so painting is a 1:1 blit.
+
+    add() builds a mipmap chain (each level half the previous one, smooth
+    filtered) at load time. get() returns the sprite scaled, squashed, rotated
+    and flipped to device pixels, built once from the nearest larger mip level
+    and kept in an LRU bounded by byte_budget.
+    """
+
+    def __init__(self, byte_budget: int = 64 * 1024 * 1024) -> None:
+        self.byte_budget = byte_budget
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._mipmaps: dict[Hashable, list[QtGui.QPixmap]] = {}
+        self._scaled: OrderedDict[Tuple, QtGui.QPixmap] = OrderedDict()
+        self._regions: OrderedDict[int, QtGui.QRegion] = OrderedDict()
+
+    def add(self, sprite: QtGui.QPixmap) -> Hashable:
+        key = sprite.cacheKey()
+        if key in self._mipmaps:
+            return key
+        levels = [sprite]
+        while min(levels[-1].width(), levels[-1].height()) >= MIN_MIP_SIZE * 2:
+            previous = levels[-1]
+            levels.append(
+                previous.scaled(
+                    max(1, previous.width() // 2),
+                    max(1, previous.height() // 2),
+                    QtCore.Qt.IgnoreAspectRatio,
+                    QtCore.Qt.SmoothTransformation,
+                )
+            )
+        self._mipmaps[key] = levels
+        return key
+
+    def get(
+        self,
+        sprite: QtGui.QPixmap,
+        scale: float,
+        squash_x: float = 1.0,
+        squash_y: float = 1.0,
+        rotation_deg: float = 0.0,
+        flip_x: bool = False,
+        device_pixel_ratio: float = 1.0,
+    ) -> QtGui.QPixmap:
+        """sprite transformed for drawing; its devicePixelRatio is set, so its logical size is the draw size."""
+        sprite_key = self.add(sprite)
+        key = (
+            sprite_key,
+            _quantize(scale, SCALE_STEP),
+            _quantize(squash_x, SQUASH_STEP),
+            _quantize(squash_y, SQUASH_STEP),
+            int(round(rotation_deg)) % 360,
+            bool(flip_x),
+            _quantize(device_pixel_ratio, 0.25),
+        )
+        cached = self._scaled.get(key)
+        if cached is not None:
+            self._scaled.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        pixmap = self._build(self._mipmaps[sprite_key], *key[1:])
+        size = _pixmap_bytes(pixmap)
+        if size <= self.byte_budget:
+            self._scaled[key] = pixmap
+            self.bytes += size
+            self._evict()
+        return pixmap
+
+    def _build(
+        self,
+        levels: list[QtGui.QPixmap],
+        scale: float,
+        squash_x: float,
+        squash_y: float,
+        rotation_deg: int,
+        flip_x: bool,
+        device_pixel_ratio: float,
+    ) -> QtGui.QPixmap:
+        width = max(1, int(round(levels[0].width() * scale * squash_x * device_pixel_ratio)))
+        height = max(1, int(round(levels[0].height() * scale * squash_y * device_pixel_ratio)))
+        #  Downscale from the smallest level that is still at least as large as the target.
+        source = levels[0]
+        for level in levels[1:]:
+            if level.width() < width or level.height() < height:
+                break
+            source = level
+        pixmap = QtGui.QPixmap(source)  # shallow copy; setDevicePixelRatio below must not touch the sprite
+        if (source.width(), source.height()) != (width, height):
+            pixmap = source.scaled(width, height, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)
+        if rotation_deg or flip_x:
+            #  Same order as painting with rotate() then scale(-1, 1): flip first, then rotate.
+            transform = QtGui.QTransform()
+            transform.rotate(rotation_deg)
+            if flip_x:
+                transform.scale(-1, 1)
+            pixmap = pixmap.transformed(transform, QtCore.Qt.SmoothTransformation)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        return pixmap
+
+    def alpha_region(self, frame: QtGui.QPixmap) -> QtGui.QRegion:
+        """Pixels of a get() frame with any alpha, in logical coordinates from its top-left."""
+        key = frame.cacheKey()
+        region = self._regions.get(key)
+        if region is not None:
+            self._regions.move_to_end(key)
+            return region
+        region = region_from_alpha(frame)
+        self._regions[key] = region
+        while len(self._regions) > MAX_CACHED_REGIONS:
+            self._regions.popitem(last=False)
+        return region
+
+    def _evict(self) -> None:
+        while self.bytes > self.byte_budget and len(self._scaled) > 1:
+            _, pixmap = self._scaled.popitem(last=False)
+            self.bytes -= _pixmap_bytes(pixmap)
+
+    def discard(self, sprite: Optional[QtGui.QPixmap] = None) -> None:
+        """Drop pre-scaled pixmaps of one sprite (or all of them); mipmaps stay."""
+        sprite_key = None if sprite is None else sprite.cacheKey()
+        for key in [key for key in self._scaled if sprite_key is None or key[0] == sprite_key]:
+            self.bytes -= _pixmap_bytes(self._scaled.pop(key))
@@ -0,0 +1,74 @@
+import os
+import select
+import shutil
+import subprocess
+import time
+
+import pytest
+
+pytest.importorskip("Xlib")
+pytest.importorskip("PyQt5.QtCore")
+
+from slack_detection import SlackDetectionState
+from slack_detection.global_input import start_global_input_monitor
+from slack_detection.input_recording import drain_global_input
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which("Xvfb") and shutil.which("xdotool")),
+    reason="needs Xvfb and xdotool",
+)
+
+
+@pytest.fixture
+def xvfb_display(monkeypatch):
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(write_fd), "-nolisten", "tcp", "-screen", "0", "640x480x24"],
+        pass_fds=(write_fd,),
+        stderr=subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    try:
+        readable, _, _ = select.select([read_fd], [], [], 10.0)
+        number = os.read(read_fd, 16).decode().strip() if readable else ""
+        if not number:
+            pytest.skip("Xvfb did not start")
+        display = f":{number}"
+        monkeypatch.setenv("DISPLAY", display)
+        yield display
+    finally:
+        os.close(read_fd)
+        server.terminate()
+        server.wait(timeout=5)
+
+
+def test_xrecord_sees_xdotool_input(xvfb_display):
+    state = SlackDetectionState()
+    seen: list[str] = []
+    state.activity_listeners.append(lambda kind, _timestamp: seen.append(kind))
+    stop = start_global_input_monitor(state)
+    assert stop is not None, state.global_input_status
+    try:
+        assert state.global_input_status == "active (xrecord)"
+        #  `ready` fires just before record_enable_context; give it a moment to enable
+        time.sleep(0.2)
+        subprocess.run(
+            ["xdotool", "mousemove", "20", "20", "click", "4", "click", "5", "click", "1", "type", "hi"],
+            check=True,
+        )
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            drain_global_input(state)
+            if seen.count("key") >= 2 and seen.count("click") >= 1 and seen.count("scroll") >= 2:
+                break
+            time.sleep(0.05)
+    finally:
+        stop()
+    drain_global_input(state)
+
+    assert seen.count("scroll") == 2
+    assert seen.count("click") == 1
+    assert seen.count("key") == 2
+    assert "move" in seen
+    assert len(state.click_timestamps) == 1
+    assert state.global_input_status == "stopped"
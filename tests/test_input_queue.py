@@ -0,0 +1,69 @@
+import threading
+
+from slack_detection.input_queue import InputEventQueue
+
+
+def test_moves_merge_into_one_event_in_time_order():
+    queue = InputEventQueue()
+    queue.push("click", 10)
+    for timestamp in (11, 12, 13, 14):
+        queue.push("move", timestamp)
+    queue.push("scroll", 20)
+
+    assert queue.drain() == [("click", 10), ("move", 14), ("scroll", 20)]
+    assert queue.merged == 3
+    assert queue.received == 6
+    assert queue.pushed == 2
+    assert queue.delivered == 3
+    #  Nothing new, so no move is replayed
+    assert queue.drain() == []
+
+    queue.push("move", 30)
+    assert queue.drain() == [("move", 30)]
+    assert queue.merged == 3
+
+
+def test_full_queue_drops_but_keeps_moves():
+    queue = InputEventQueue(capacity=2)
+    queue.push_batch([("click", 1), ("key", 2), ("scroll", 3), ("move", 4), ("click", 5)])
+    assert queue.dropped == 2
+    assert queue.pushed == 2
+    assert len(queue) == 2
+    assert queue.drain() == [("click", 1), ("key", 2), ("move", 4)]
+    assert queue.received == 5
+
+
+def test_wake_after_clicks_and_scrolls_only():
+    queue = InputEventQueue()
+    wakes = []
+    queue.wake = lambda: wakes.append(1)
+    queue.push("key", 1)
+    queue.push("move", 2)
+    assert wakes == []
+    queue.push("click", 3)
+    assert len(wakes) == 1
+    queue.push_batch([("scroll", 4), ("scroll", 5), ("key", 6)])
+    assert len(wakes) == 2
+    queue.push_batch([("key", 7), ("move", 8)])
+    assert len(wakes) == 2
+
+
+def test_one_producer_one_consumer_loses_nothing():
+    queue = InputEventQueue(capacity=1_000_000)
+    total = 50_000
+    drained = []
+
+    def produce():
+        for timestamp in range(total):
+            queue.push("click" if timestamp % 2 else "scroll", timestamp)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive():
+        drained.extend(queue.drain())
+    producer.join()
+    drained.extend(queue.drain())
+
+    assert [timestamp for _, timestamp in drained] == list(range(total))
+    assert queue.dropped == 0
+    assert queue.delivered == total
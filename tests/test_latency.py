@@ -0,0 +1,96 @@
+import math
+import random
+
+import pytest
+
+from slack_detection.latency import DecisionLatencyTracker, LatencyHistogram, RollingLatencyHistogram
+
+
+def _exact_percentile(values: list[int], q: float) -> int:
+    return sorted(values)[max(1, math.ceil(q / 100 * len(values))) - 1]
+
+
+@pytest.mark.parametrize("sub_bucket_bits", [4, 6, 8])
+def test_percentile_error_bound(sub_bucket_bits):
+    rng = random.Random(sub_bucket_bits)
+    #  Latencies from microseconds to tens of seconds, log-uniform
+    values = [int(10 ** rng.uniform(3, 10.5)) for _ in range(5000)] + list(range(100))
+    histogram = LatencyHistogram(sub_bucket_bits)
+    for value in values:
+        histogram.record(value)
+    relative_error = 1 / 2 ** (sub_bucket_bits - 1)
+
+    assert histogram.total == len(values)
+    assert histogram.max_ns == max(values)
+    for q in (0, 1, 10, 50, 90, 99, 99.9, 100):
+        exact = _exact_percentile(values, q)
+        reported = histogram.percentile(q)
+        assert exact <= reported <= exact * (1 + relative_error)
+
+
+def test_hand_checked_percentiles():
+    ms = 1_000_000
+    histogram = LatencyHistogram()
+    for value in range(1, 11):
+        histogram.record(value * ms)
+    #  p50 of 1..10 ms is 5 ms and p90 is 9 ms, each reported as its bucket's upper edge
+    assert 5 * ms <= histogram.percentile(50) <= 5 * ms * (1 + 1 / 32)
+    assert 9 * ms <= histogram.percentile(90) <= 9 * ms * (1 + 1 / 32)
+    assert histogram.percentile(100) == 10 * ms
+
+    pair = LatencyHistogram()
+    pair.record(1 * ms)
+    pair.record(100 * ms)
+    assert pair.percentile(50) <= 1 * ms * (1 + 1 / 32)
+
+
+def test_small_values_are_exact_and_empty_is_zero():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+    for value in (-5, 0, 1, 2, 3):
+        histogram.record(value)
+    assert histogram.percentile(0) == 0
+    assert histogram.percentile(100) == 3
+
+
+def test_merge_matches_recording_everything_once():
+    rng = random.Random(1)
+    values = [rng.randrange(1, 10**9) for _ in range(2000)]
+    whole, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for index, value in enumerate(values):
+        whole.record(value)
+        (left if index % 2 else right).record(value)
+    left.merge(right)
+    assert left.counts == whole.counts
+    assert left.total == whole.total
+    assert left.max_ns == whole.max_ns
+
+
+def test_rolling_histogram_drops_old_slices():
+    rolling = RollingLatencyHistogram(window_s=60.0, slices=6)
+    rolling.record(1_000, now=0.0)
+    rolling.record(2_000, now=30.0)
+    assert rolling.merged(now=30.0).total == 2
+    assert rolling.merged(now=65.0).total == 1
+    assert rolling.merged(now=200.0).total == 0
+
+
+def test_tracker_segments_and_abandoned_decisions():
+    tracker = DecisionLatencyTracker(expire_s=1.0)
+    tracker.begin("slap", input_ns=1_000_000, verdict_ns=3_000_000, chosen_ns=4_000_000)
+    tracker.visible("slap", visible_ns=10_000_000)
+    tracker.visible("slap", visible_ns=11_000_000)  # nothing pending any more
+
+    tracker.begin("bite", input_ns=0, verdict_ns=0, chosen_ns=0)
+    tracker.begin("bite", input_ns=0, verdict_ns=0, chosen_ns=0)  # replaces the first
+    tracker.visible("bite", visible_ns=2_000_000_000)  # past expire_s
+    tracker.begin("splat", input_ns=0, verdict_ns=0, chosen_ns=0)
+    tracker.cancel("splat")
+
+    assert tracker.completed == 1
+    assert tracker.abandoned == 3
+    report = tracker.snapshot()
+    assert set(report) == {"slap"}
+    assert report["slap"]["input->visible"]["max_ms"] == pytest.approx(9.0)
+    assert report["slap"]["chosen->visible"]["max_ms"] == pytest.approx(6.0)
+    assert report["slap"]["input->visible"]["count"] == 1
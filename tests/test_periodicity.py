@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from slack_detection import _is_periodic
+from slack_detection.periodicity import PeriodicityTracker
+from slack_detection.ring_buffer import TimestampRing
+
+PARAMS = [
+    (4, 0.62, 13.0, 1.0),
+    (4, 0.0, float("inf"), 0.2),
+    (6, 0.5, 3.0, 0.5),
+    (2, 0.0, 1.0, 0.0),
+]
+
+
+def _streams(seed: int = 7) -> list[list[int]]:
+    rng = random.Random(seed)
+    streams = []
+    for _ in range(40):
+        base = rng.choice([0.3, 1.0, 2.5, 8.0, 20.0])
+        jitter = rng.choice([0.0, 0.05, 0.4, 1.5])
+        now = 10_000_000_000
+        stream = []
+        for _ in range(rng.randint(0, 30)):
+            gap_ms = max(0, int(rng.gauss(base, base * jitter) * 1000))
+            if rng.random() < 0.05:
+                gap_ms = 0  # two events on the same tick
+            now += gap_ms * 1_000_000
+            stream.append(now)
+        streams.append(stream)
+    return streams
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_tracker_matches_is_periodic_after_every_event(params):
+    for stream in _streams():
+        tracker = PeriodicityTracker(*params)
+        ring = TimestampRing(120)
+        for timestamp in stream:
+            ring.append(timestamp)
+            assert tracker.add(timestamp) == _is_periodic(ring, *params)
+            assert tracker.periodic == _is_periodic([t / 1e9 for t in ring], *params)
+
+
+def test_verdict_reconfigures_from_recent_timestamps():
+    ring = TimestampRing(120)
+    tracker = PeriodicityTracker(4, 0.0, float("inf"), 0.1)
+    for second in (1, 2, 3, 4, 5, 9):
+        ring.append(second * 1_000_000_000)
+        tracker.add(second * 1_000_000_000)
+    assert tracker.periodic is False
+
+    #  Fewer events and looser jitter: the regular 3..5 tail is periodic again
+    assert tracker.verdict(3, 0.0, float("inf"), 1.0, ring) == _is_periodic(ring, 3, 0.0, float("inf"), 1.0)
+    assert tracker.verdict(3, 0.0, float("inf"), 0.1, ring) is False
+
+
+def test_clear_forgets_history():
+    tracker = PeriodicityTracker(3, 0.0, float("inf"), 1.0)
+    for second in (1, 2, 3):
+        tracker.add(second * 1_000_000_000)
+    assert tracker.periodic
+    tracker.clear()
+    assert not tracker.periodic
+    assert not tracker.add(4_000_000_000)
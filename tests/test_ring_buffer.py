@@ -0,0 +1,61 @@
+import pytest
+
+from slack_detection.ring_buffer import TimestampRing
+
+
+def test_empty_ring():
+    ring = TimestampRing(4)
+    assert len(ring) == 0
+    assert not ring
+    assert list(ring.last(3)) == []
+    assert ring.intervals(3) == []
+
+
+def test_last_and_intervals_before_wraparound():
+    ring = TimestampRing(5)
+    for timestamp in (10, 13, 19):
+        ring.append(timestamp)
+    assert list(ring) == [10, 13, 19]
+    assert list(ring.last(2)) == [13, 19]
+    assert list(ring.last(10)) == [10, 13, 19]
+    assert ring.intervals(3) == [3, 6]
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 4, 7])
+def test_last_and_intervals_after_wraparound(capacity):
+    ring = TimestampRing(capacity)
+    pushed = []
+    for step in range(3 * capacity + 2):
+        timestamp = step * step * 1_000_000
+        ring.append(timestamp)
+        pushed.append(timestamp)
+        kept = pushed[-capacity:]
+        assert len(ring) == len(kept)
+        assert list(ring) == kept
+        for n in range(capacity + 2):
+            expected = kept[-n:] if n else []
+            assert list(ring.last(n)) == expected
+            assert ring.intervals(n) == [b - a for a, b in zip(expected, expected[1:])]
+        assert ring[0] == kept[0]
+        assert ring[-1] == kept[-1]
+
+
+def test_indexing_out_of_range():
+    ring = TimestampRing(2)
+    ring.append(1)
+    with pytest.raises(IndexError):
+        ring[1]
+    with pytest.raises(IndexError):
+        ring[-2]
+
+
+def test_clear_and_int64_range():
+    ring = TimestampRing(3)
+    big = 2**62
+    for timestamp in (big, big + 1, big + 3):
+        ring.append(timestamp)
+    assert ring.intervals(3) == [1, 2]
+    ring.clear()
+    assert len(ring) == 0
+    ring.append(5)
+    assert list(ring) == [5]
@@ -0,0 +1,73 @@
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from timeline import Animation, Ticker, Timeline, Tween, keyframe_value, linear
+
+
+@pytest.fixture
+def timeline(monkeypatch):
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    clock = [100.0]
+    monkeypatch.setattr(Timeline, "now", property(lambda self: clock[0]))
+    timeline = Timeline(app, refresh_hz=60.0)
+    timeline.clock = clock
+    yield timeline
+    timeline._timer.stop()
+
+
+def test_animation_is_abstract():
+    with pytest.raises(TypeError):
+        Animation()
+
+
+def test_keyframe_value_interpolates_per_segment():
+    keyframes = [(0.0, 0.0), (1.0, 10.0), (3.0, 0.0)]
+    assert keyframe_value(keyframes, -1.0) == 0.0
+    assert keyframe_value(keyframes, 0.5) == pytest.approx(5.0)
+    assert keyframe_value(keyframes, 1.0) == pytest.approx(10.0)
+    assert keyframe_value(keyframes, 2.5) == pytest.approx(2.5)
+    assert keyframe_value(keyframes, 9.0) == 0.0
+    assert keyframe_value([(0.0, (0.0, 4.0)), (2.0, (2.0, 0.0))], 1.0) == pytest.approx((1.0, 2.0))
+    #  Easing applies within each segment, not over the whole tween
+    assert keyframe_value(keyframes, 2.0, lambda t: t * t) == pytest.approx(7.5)
+
+
+def test_keyframe_tween_runs_through_every_keyframe(timeline):
+    seen = []
+    finished = []
+    tween = Tween(
+        seen.append,
+        keyframes=[(0.4, 1.0), (0.0, 0.0), (0.2, 2.0)],
+        easing=linear,
+        on_finished=lambda: finished.append(True),
+        timeline=timeline,
+    )
+    assert tween.duration_s == pytest.approx(0.4)
+    tween.started_at = timeline.clock[0]
+    tween._active = True
+    for elapsed in (0.1, 0.2, 0.3, 0.5):
+        timeline.clock[0] = tween.started_at + elapsed
+        tween.step(timeline.clock[0])
+    assert seen == pytest.approx([1.0, 2.0, 1.5, 1.0])
+    assert finished == [True]
+    with pytest.raises(ValueError):
+        tween.set_keyframes([])
+
+
+def test_failing_animation_does_not_stop_the_others(timeline, capsys):
+    calls = []
+
+    def broken():
+        calls.append("broken")
+        raise RuntimeError("boom")
+
+    Ticker(broken, timeline=timeline).start()
+    Ticker(lambda: calls.append("fine"), timeline=timeline).start()
+    for animation in timeline._animations:
+        animation.next_due = 0.0
+
+    timeline._on_frame()
+    assert calls == ["broken", "fine"]
+    assert timeline._timer.isActive()
+    assert "RuntimeError: boom" in capsys.readouterr().err
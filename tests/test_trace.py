@@ -0,0 +1,102 @@
+import pytest
+
+#  The replayer runs the real detectors, which reach utils (and QtMultimedia) via the window registry
+pytest.importorskip("PyQt5.QtMultimedia", exc_type=ImportError)
+
+from slack_detection import SlackDetectionState
+from slack_detection.trace import (
+    KIND_CLICK,
+    KIND_KEY,
+    KIND_MOVE,
+    KIND_SCROLL,
+    KIND_WINDOW,
+    ReplayParams,
+    TraceEvent,
+    TraceRecorder,
+    iter_trace,
+    replay_trace,
+)
+
+
+def test_write_then_mmap_read_round_trip(tmp_path):
+    path = tmp_path / "session.nbt"
+    recorder = TraceRecorder(path)
+    recorder.record_input("click", 1_000)
+    recorder.record_window("firefox", "YouTube — Shorts", 2_000)
+    recorder.record_input("scroll", 3_000)
+    #  Payload lengths 0..9 cover every amount of padding
+    for length in range(10):
+        recorder.record_window("a" * length, None, 4_000 + length)
+    recorder.record_window(None, "ünïcode ✓", 5_000)
+    recorder.record_input("key", 6_000)
+    recorder.record_input("move", 7_000)
+    recorder.record_input("unknown", 8_000)
+    recorder.close()
+    recorder.record_input("click", 9_000)  # ignored once closed
+
+    assert recorder.events == 16
+    assert list(iter_trace(path)) == [
+        TraceEvent(1_000, KIND_CLICK),
+        TraceEvent(2_000, KIND_WINDOW, "firefox", "YouTube — Shorts"),
+        TraceEvent(3_000, KIND_SCROLL),
+        *[TraceEvent(4_000 + length, KIND_WINDOW, "a" * length or None, None) for length in range(10)],
+        TraceEvent(5_000, KIND_WINDOW, None, "ünïcode ✓"),
+        TraceEvent(6_000, KIND_KEY),
+        TraceEvent(7_000, KIND_MOVE),
+    ]
+
+
+def test_recorder_attaches_to_activity_listeners(tmp_path):
+    path = tmp_path / "session.nbt"
+    state = SlackDetectionState()
+    recorder = TraceRecorder(path)
+    recorder.attach(state)
+    for listener in state.activity_listeners:
+        listener("scroll", 42)
+    recorder.close()
+    assert list(iter_trace(path)) == [TraceEvent(42, KIND_SCROLL)]
+
+
+def test_empty_and_foreign_files(tmp_path):
+    empty = tmp_path / "empty.nbt"
+    empty.write_bytes(b"")
+    assert list(iter_trace(empty)) == []
+
+    foreign = tmp_path / "foreign.nbt"
+    foreign.write_bytes(b"NOTATRACE" + bytes(32))
+    with pytest.raises(ValueError):
+        list(iter_trace(foreign))
+
+
+def test_replay_counts_events(tmp_path):
+    path = tmp_path / "session.nbt"
+    recorder = TraceRecorder(path)
+    recorder.record_window("code", "main.py", 0)
+    for second in range(1, 6):
+        recorder.record_input("click", second * 1_000_000_000)
+    recorder.close()
+
+    result = replay_trace(path)
+    assert result.events == 6
+    assert result.duration_s == pytest.approx(5.0)
+    assert result.counts() == {}
+
+
+def test_replay_reacts_again_after_the_cooldown(tmp_path):
+    path = tmp_path / "session.nbt"
+    recorder = TraceRecorder(path)
+    start_ns = 5_000 * 1_000_000_000
+    recorder.record_window("discord", "general", start_ns)
+    recorder.record_input("key", start_ns + 31 * 1_000_000_000)
+    recorder.close()
+
+    params = ReplayParams(slacking_threshold=10, daydreaming_threshold=1000, action_cooldown_s=5)
+    result = replay_trace(path, params)
+    #  The first reaction clears last_input_time, so the idle verdict stays true until the key
+    assert result.firings == [
+        (10.0, "window slack"),
+        (15.0, "idle"),
+        (20.0, "idle"),
+        (25.0, "idle"),
+        (30.0, "idle"),
+    ]
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import bisect
+import math
+import time
+import traceback
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+from PyQt5 import QtCore, QtGui
+
+DEFAULT_REFRESH_HZ = 60.0
+
+Value = Union[float, Sequence[float]]
+Easing = Callable[[float], float]
+#  (seconds since the tween started, value at that time)
+Keyframe = Tuple[float, Value]
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_out_cubic(t: float) -> float:
+    return 1.0 - (1.0 - t) ** 3
+
+
+def ease_in_out_sine(t: float) -> float:
+    return 0.5 - 0.5 * math.cos(math.pi * t)
+
+
+def lerp(start: Value, end: Value, t: float) -> Value:
+    if isinstance(start, (int, float)):
+        return start + (end - start) * t
+    return tuple(a + (b - a) * t for a, b in zip(start, end))
+
+
+def keyframe_value(keyframes: Sequence[Keyframe], t: float, easing: Easing = linear) -> Value:
+    """Value at t seconds of keyframes sorted by time, eased within each segment."""
+    if t <= keyframes[0][0]:
+        return keyframes[0][1]
+    if t >= keyframes[-1][0]:
+        return keyframes[-1][1]
+    index = bisect.bisect_right([time_s for time_s, _ in keyframes], t)
+    (t0, v0), (t1, v1) = keyframes[index - 1], keyframes[index]
+    return lerp(v0, v1, easing((t - t0) / (t1 - t0)))
+
+
+class Animation(ABC):
+    """Something the shared Timeline steps. Keeps the QTimer surface callers rely on.
+
+    interval_ms is how often step() wants to run; 0 means every display frame.
+    Intervals are rounded to whole frames, so every animation that is due wakes
+    up on the same frame.
+    """
+
+    def __init__(self, interval_ms: int = 0, timeline: Optional["Timeline"] = None) -> None:
+        self._timeline = timeline
+        self._interval_s = max(0, int(interval_ms)) / 1000.0
+        self._active = False
+        self.started_at = 0.0
+        self.next_due = 0.0
+
+    @property
+    def timeline(self) -> "Timeline":
+        if self._timeline is None:
+            self._timeline = get_timeline()
+        return self._timeline
+
+    @property
+    def elapsed_s(self) -> float:
+        return self.timeline.now - self.started_at
+
+    def interval(self) -> int:
+        return int(round(self._interval_s * 1000))
+
+    def setInterval(self, interval_ms: int) -> None:
+        self._interval_s = max(0, int(interval_ms)) / 1000.0
+
+    def isActive(self) -> bool:
+        return self._active
+
+    def start(self, interval_ms: Optional[int] = None) -> None:
+        """(Re)start; the first step runs once the interval has passed, like QTimer."""
+        if interval_ms is not None:
+            self.setInterval(interval_ms)
+        now = time.monotonic()
+        if not self._active:
+            self.started_at = now
+        self._active = True
+        self.next_due = now + self._interval_s
+        self.timeline.add(self)
+
+    def stop(self) -> None:
+        self._active = False
+        if self._timeline is not None:
+            self._timeline.remove(self)
+
+    def _run(self, now: float) -> None:
+        self.next_due = now + self._interval_s
+        self.step(now)
+
+    @abstractmethod
+    def step(self, now: float) -> None:
+        """Advance to `now` (the shared frame time); called when the animation is due."""
+
+
+class Ticker(Animation):
+    """Calls fn every interval until stopped; the drop-in for a repeating QTimer."""
+
+    def __init__(self, fn: Callable[[], None], interval_ms: int = 0, timeline: Optional["Timeline"] = None) -> None:
+        super().__init__(interval_ms, timeline)
+        self.fn = fn
+
+    def step(self, now: float) -> None:
+        self.fn()
+
+
+class Tween(Animation):
+    """Eases a value from start to end over duration_s and hands every frame's value to apply.
+
+    With keyframes ([(t, value), ...], t in seconds from the start) the value
+    instead runs through every keyframe, eased per segment, and the last
+    keyframe's time is the duration.
+
+    Stops (and calls on_finished) after applying the final value, unless hold
+    is set: then it keeps applying it every interval until stopped, for
+    animations that must keep following something once they have arrived.
+    """
+
+    def __init__(
+        self,
+        apply: Optional[Callable[[Value], None]] = None,
+        start: Value = 0.0,
+        end: Value = 1.0,
+        duration_s: float = 0.25,
+        easing: Easing = ease_out_cubic,
+        hold: bool = False,
+        on_finished: Optional[Callable[[], None]] = None,
+        interval_ms: int = 0,
+        timeline: Optional["Timeline"] = None,
+        keyframes: Optional[Sequence[Keyframe]] = None,
+    ) -> None:
+        super().__init__(interval_ms, timeline)
+        self.apply = apply
+        self.start_value = start
+        self.end_value = end
+        self.duration_s = duration_s
+        self.easing = easing
+        self.hold = hold
+        self.on_finished = on_finished
+        self.keyframes: Optional[Sequence[Keyframe]] = None
+        if keyframes is not None:
+            self.set_keyframes(keyframes)
+
+    def set_keyframes(self, keyframes: Sequence[Keyframe]) -> None:
+        if not keyframes:
+            raise ValueError("Tween needs at least one keyframe")
+        self.keyframes = sorted(keyframes, key=lambda keyframe: keyframe[0])
+        self.start_value = self.keyframes[0][1]
+        self.end_value = self.keyframes[-1][1]
+        self.duration_s = self.keyframes[-1][0]
+
+    @property
+    def progress(self) -> float:
+        if self.duration_s <= 0:
+            return 1.0
+        return min(1.0, max(0.0, self.elapsed_s / self.duration_s))
+
+    def value(self) -> Value:
+        if self.keyframes is not None:
+            return keyframe_value(self.keyframes, min(self.elapsed_s, self.duration_s), self.easing)
+        return lerp(self.start_value, self.end_value, self.easing(self.progress))
+
+    def step(self, now: float) -> None:
+        finished = self.progress >= 1.0
+        if self.apply is not None:
+            self.apply(self.value())
+        if finished and not self.hold and self._active:
+            self.stop()
+            if self.on_finished is not None:
+                self.on_finished()
+
+
+class Timeline(QtCore.QObject):
+    """One precise timer, aligned to the display refresh, that steps every running animation.
+
+    The timer is single shot and re-armed for the next frame on which some
+    animation is due, so N animations cost one wakeup per frame (or fewer when
+    they all run slower than the display) and nothing at all when none run.
+    """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, refresh_hz: Optional[float] = None) -> None:
+        super().__init__(parent)
+        if refresh_hz is None:
+            screen = QtGui.QGuiApplication.primaryScreen()
+            refresh_hz = screen.refreshRate() if screen is not None else DEFAULT_REFRESH_HZ
+        self.frame_s = 1.0 / max(1.0, refresh_hz or DEFAULT_REFRESH_HZ)
+        self.wakeups = 0
+        self._frame_now = self._epoch = time.monotonic()
+        self._animations: list[Animation] = []
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_frame)
+        self._stepping = False
+
+    @property
+    def now(self) -> float:
+        """The current frame's time while stepping, so every animation sees the same clock."""
+        return self._frame_now if self._stepping else time.monotonic()
+
+    def add(self, animation: Animation) -> None:
+        if animation not in self._animations:
+            self._animations.append(animation)
+        if not self._stepping:
+            self._schedule()
+
+    def remove(self, animation: Animation) -> None:
+        if animation in self._animations:
+            self._animations.remove(animation)
+        if not self._stepping and not self._animations:
+            self._timer.stop()
+
+    def __len__(self) -> int:
+        return len(self._animations)
+
+    def _on_frame(self) -> None:
+        self._frame_now = now = time.monotonic()
+        self.wakeups += 1
+        #  Anything due within half a frame runs now rather than one frame late
+        due_by = now + self.frame_s / 2
+        self._stepping = True
+        try:
+            for animation in list(self._animations):
+                if animation.isActive() and animation.next_due <= due_by:
+                    try:
+                        animation._run(now)
+                    except Exception:
+                        #  One broken callback must not freeze every other animation
+                        print(f"timeline: {animation!r} failed")
+                        traceback.print_exc()
+        finally:
+            self._stepping = False
+            #  The timer is single shot: re-arm it whatever happened above
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if not self._animations:
+            self._timer.stop()
+            return
+        now = time.monotonic()
+        target = min(animation.next_due for animation in self._animations)
+        #  Wake on the frame boundary nearest the earliest due time, but at least half a
+        #  frame from now, so animations due around the same time share one wakeup
+        nearest = math.ceil((target - self._epoch) / self.frame_s - 0.5)
+        next_frame = math.floor((now - self._epoch) / self.frame_s + 0.5) + 1
+        wake_at = self._epoch + max(nearest, next_frame) * self.frame_s
+        self._timer.start(max(0, int(round((wake_at - now) * 1000))))
+
+
+_timeline: Optional[Timeline] = None
+
+
+def get_timeline() -> Timeline:
+    global _timeline
+    if _timeline is None:
+        _timeline = Timeline(QtCore.QCoreApplication.instance())
+    return _timeline
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import os
+import platform
+import select
+import threading
+from typing import Optional
+
+from PyQt5 import QtCore
+
+from slack_detection.x11 import X11_PLATFORMS
+
+
+class WindowGeometryWatcher(QtCore.QObject):
+    """Follows one X11 window's geometry through ConfigureNotify/DestroyNotify.
+
+    Runs on its own thread with its own X connection and only emits
+    geometry_changed when the absolute rect actually differs from the last one,
+    so a still window costs nothing. start() returns False when X events are
+    unavailable (no python-xlib, not X11) and the caller should poll instead.
+
+    Do not parent it to the widget it follows: the owner must stop() it (which
+    joins the thread) before anything its signals are connected to is deleted.
+    """
+
+    geometry_changed = QtCore.pyqtSignal(QtCore.QRect)
+    window_closed = QtCore.pyqtSignal()
+
+    def __init__(self, window_id: str, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self.window_id = window_id
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        #  Self-pipe: stop() writes a byte so the select() in the loop returns at once
+        self._wake_fds: Optional[tuple[int, int]] = None
+
+    def start(self) -> bool:
+        if platform.system().lower() not in X11_PLATFORMS:
+            return False
+        try:
+            from Xlib import X, display  # type: ignore
+        except Exception:
+            return False
+        try:
+            conn = display.Display()
+            window = conn.create_resource_object("window", int(self.window_id, 16))
+            window.change_attributes(event_mask=X.StructureNotifyMask)
+            conn.flush()
+        except Exception:
+            return False
+        self._wake_fds = os.pipe()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            args=(X, conn, window, self._wake_fds[0]),
+            name="WindowGeometryWatcher",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, timeout_s: float = 1.0) -> None:
+        """Stop the thread and wait for it, so nothing is emitted once this returns.
+
+        The loop is woken through the self-pipe, so the join returns right away
+        and ending a bite does not stall the GUI thread.
+        """
+        self._stop_event.set()
+        wake_fds, self._wake_fds = self._wake_fds, None
+        if wake_fds is not None:
+            try:
+                os.write(wake_fds[1], b"\0")
+            except OSError:
+                pass
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout_s)
+        if wake_fds is not None:
+            os.close(wake_fds[1])
+
+    def _run_loop(self, X, conn, window, wake_fd: int) -> None:
+        root = conn.screen().root
+        last_rect: Optional[tuple[int, int, int, int]] = None
+        fd = conn.fileno()
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([fd, wake_fd], [], [])
+                if wake_fd in readable:
+                    return
+                moved = False
+                for _ in range(conn.pending_events()):
+                    event = conn.next_event()
+                    if event.type == X.DestroyNotify:
+                        if not self._stop_event.is_set():
+                            self.window_closed.emit()
+                        return
+                    if event.type == X.ConfigureNotify:
+                        moved = True
+                if not moved or self._stop_event.is_set():
+                    continue
+                #  A burst of ConfigureNotify during a drag collapses into one query.
+                geometry = window.get_geometry()
+                origin = root.translate_coords(window, 0, 0)
+                rect = (int(origin.x), int(origin.y), int(geometry.width), int(geometry.height))
+                if rect == last_rect:
+                    continue
+                last_rect = rect
+                if not self._stop_event.is_set():
+                    self.geometry_changed.emit(QtCore.QRect(*rect))
+        except Exception:
+            #  BadWindow and friends: the window is gone.
+            if not self._stop_event.is_set():
+                self.window_closed.emit()
+        finally:
+            os.close(wake_fd)
+            try:
+                conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from PyQt5 import QtCore
+
+from slack_detection import get_active_window_info
+
+ACTIVE_WINDOW_KEY = "active_window"
+
+
+class _ProbeJob(QtCore.QRunnable):
+    def __init__(self, probe: "WindowProbe", key: Hashable, fn: Callable[[], Any]) -> None:
+        super().__init__()
+        self._probe = probe
+        self._key = key
+        self._fn = fn
+
+    def run(self) -> None:
+        try:
+            result = self._fn()
+        except Exception as exc:
+            print(f"window probe {self._key!r} failed: {exc}")
+            result = None
+        #  Queued back onto the GUI thread because the probe lives there.
+        self._probe._finished.emit(self._key, result)
+
+
+class WindowProbe(QtCore.QObject):
+    """Runs slow window queries (osascript, xprop, ...) off the GUI thread.
+
+    Requests are keyed; a request whose key is already in flight is merged into
+    the running one. Results are delivered on the GUI thread through
+    result_ready and the optional per-request callback, and the latest result
+    per key stays available through latest() so timers never have to block.
+    """
+
+    result_ready = QtCore.pyqtSignal(object, object)
+    _finished = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        #  One worker keeps X/AppleScript access serialized.
+        self._pool.setMaxThreadCount(1)
+        self._in_flight: dict[Hashable, list[Callable[[Any], None]]] = {}
+        self._forget: set[Hashable] = set()
+        self._queued: dict[Hashable, tuple[Callable[[], Any], Optional[Callable[[Any], None]]]] = {}
+        self._latest: dict[Hashable, Any] = {}
+        self._finished.connect(self._on_finished)
+
+    def request(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        callback: Optional[Callable[[Any], None]] = None,
+        remember: bool = True,
+    ) -> bool:
+        """Queue fn under key. Returns False if it was merged into an in-flight request.
+
+        Pass remember=False for one-off commands whose result shouldn't be kept in latest().
+        """
+        callbacks = self._in_flight.get(key)
+        if callbacks is not None:
+            if callback is not None:
+                callbacks.append(callback)
+            return False
+        self._in_flight[key] = [callback] if callback is not None else []
+        if not remember:
+            self._forget.add(key)
+        self._pool.start(_ProbeJob(self, key, fn))
+        return True
+
+    def request_latest(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        callback: Optional[Callable[[Any], None]] = None,
+    ) -> bool:
+        """Like request(), but while key is in flight only the newest fn is kept and run next.
+
+        Used for animation frames: intermediate targets are skipped, the last one always lands.
+        """
+        if key not in self._in_flight:
+            return self.request(key, fn, callback, remember=False)
+        self._queued[key] = (fn, callback)
+        return False
+
+    def is_pending(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    def has_result(self, key: Hashable) -> bool:
+        return key in self._latest
+
+    def latest(self, key: Hashable, default: Any = None) -> Any:
+        return self._latest.get(key, default)
+
+    def _on_finished(self, key: Hashable, result: Any) -> None:
+        if key in self._forget:
+            self._forget.discard(key)
+        else:
+            self._latest[key] = result
+        callbacks = self._in_flight.pop(key, [])
+        self.result_ready.emit(key, result)
+        for callback in callbacks:
+            callback(result)
+        queued = self._queued.pop(key, None)
+        if queued is not None:
+            self.request(key, queued[0], queued[1], remember=False)
+
+
+_probe: Optional[WindowProbe] = None
+
+
+def get_window_probe() -> WindowProbe:
+    global _probe
+    if _probe is None:
+        _probe = WindowProbe(QtCore.QCoreApplication.instance())
+    return _probe
+
+
+def request_active_window() -> Tuple[str, str]:
+    """Queue an active-window query and return the last known (app, title), "" when unknown."""
+    probe = get_window_probe()
+    probe.request(ACTIVE_WINDOW_KEY, get_active_window_info)
+    app_name, title = probe.latest(ACTIVE_WINDOW_KEY, (None, None))
+    return app_name or "", title or ""
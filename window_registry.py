@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+import platform
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+from PyQt5 import QtCore, QtWidgets
+
+from slack_detection.x11 import get_x11_connection, query_client_windows, query_window_geometry
+from utils import _parse_xprop_value, _run_command
+
+
+@dataclass
+class WindowInfo:
+    window_id: str
+    title: str
+    app_name: Optional[str]
+    rect: QtCore.QRect
+    #  False for minimized or geometry-less windows (and macOS apps with no window):
+    #  they still count for slack detection but annoyed actions cannot target them
+    placeable: bool = True
+
+
+class WindowSnapshot:
+    """Immutable view of every open window, indexed by id and by app.
+
+    open_windows holds everything the platform lists; windows, by_id and by_app
+    only the placeable ones.
+    """
+
+    def __init__(self, windows: list[WindowInfo], generation: int, taken_at: float) -> None:
+        self.open_windows = tuple(windows)
+        self.windows = tuple(window for window in self.open_windows if window.placeable)
+        self.generation = generation
+        self.taken_at = taken_at
+        self.by_id: dict[str, WindowInfo] = {}
+        self.by_app: dict[str, list[WindowInfo]] = {}
+        for window in self.windows:
+            self.by_id[window.window_id] = window
+            self.by_app.setdefault((window.app_name or "").casefold(), []).append(window)
+
+
+class WindowRegistry:
+    """Shared window enumeration used by slack detection and every annoyed action.
+
+    Snapshots are taken at most once per ttl_s (or after invalidate()), and each
+    refresh bumps the generation counter so callers can tell when data changed.
+    """
+
+    def __init__(
+        self,
+        lister: Optional[Callable[[], list[WindowInfo]]] = None,
+        ttl_s: float = 1.0,
+    ) -> None:
+        self._lister = lister or _list_windows
+        self.ttl_s = ttl_s
+        self.generation = 0
+        #  Last snapshot taken, kept for peek(); _cached is the same snapshot while it is fresh
+        self._snapshot = WindowSnapshot([], 0, float("-inf"))
+        self._cached: Optional[WindowSnapshot] = None
+        self._refresh_lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale; safe to call from any thread (e.g. X event watchers)."""
+        self._cached = None
+
+    def _fresh(self) -> Optional[WindowSnapshot]:
+        snapshot = self._cached
+        if snapshot is None or time.monotonic() - snapshot.taken_at >= self.ttl_s:
+            return None
+        return snapshot
+
+    def snapshot(self) -> WindowSnapshot:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot
+        with self._refresh_lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot
+            windows = self._lister()
+            self.generation += 1
+            self._snapshot = self._cached = WindowSnapshot(windows, self.generation, time.monotonic())
+            return self._snapshot
+
+    def is_stale(self) -> bool:
+        return self._fresh() is None
+
+    def peek(self, window_id: str) -> Optional[WindowInfo]:
+        """Look up a window in the current snapshot without ever triggering a rescan."""
+        return self._snapshot.by_id.get(window_id)
+
+    def windows(self) -> tuple[WindowInfo, ...]:
+        return self.snapshot().windows
+
+    def open_windows(self) -> tuple[WindowInfo, ...]:
+        """Every listed window, placeable or not; what slack detection looks at."""
+        return self.snapshot().open_windows
+
+    def get(self, window_id: str) -> Optional[WindowInfo]:
+        return self.snapshot().by_id.get(window_id)
+
+    def by_app(self, app_name: Optional[str]) -> list[WindowInfo]:
+        return self.snapshot().by_app.get((app_name or "").casefold(), [])
+
+    def update_rect(self, window_id: str, rect: QtCore.QRect) -> None:
+        """Record a geometry change we caused ourselves without rescanning every window."""
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            window = snapshot.by_id.get(window_id)
+            if window is None:
+                return
+            updated = replace(window, rect=QtCore.QRect(rect))
+            self.generation += 1
+            self._snapshot = WindowSnapshot(
+                [updated if w is window else w for w in snapshot.open_windows],
+                self.generation,
+                snapshot.taken_at,
+            )
+            if self._cached is snapshot:
+                self._cached = self._snapshot
+
+
+_registry: Optional[WindowRegistry] = None
+
+
+def get_window_registry() -> WindowRegistry:
+    global _registry
+    if _registry is None:
+        _registry = WindowRegistry()
+    return _registry
+
+
+def _list_windows() -> list[WindowInfo]:
+    system = platform.system().lower()
+    if system == "windows":
+        return _list_windows_windows()
+    if system == "darwin":
+        return _list_windows_macos()
+    return _list_windows_linux()
+
+
+def _list_windows_windows() -> list[WindowInfo]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+    except Exception:
+        return []
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    windows: list[WindowInfo] = []
+
+    EnumWindowsProc = ctypes.WINFUNCTYPE(
+        wintypes.BOOL, wintypes.HWND, wintypes.LPARAM
+    )
+
+    def enum_callback(hwnd: wintypes.HWND, _lparam: wintypes.LPARAM) -> wintypes.BOOL:
+        if not user32.IsWindowVisible(hwnd):
+            return True
+        length = user32.GetWindowTextLengthW(hwnd)
+        if length == 0:
+            return True
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buffer, length + 1)
+        title = buffer.value
+        if not title:
+            return True
+        placeable = not user32.IsIconic(hwnd)
+        rect = wintypes.RECT()
+        if not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            rect = wintypes.RECT()
+            placeable = False
+        width = rect.right - rect.left
+        height = rect.bottom - rect.top
+        if width <= 0 or height <= 0:
+            placeable = False
+
+        process_id = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(process_id))
+        handle = kernel32.OpenProcess(0x1000, False, process_id.value)
+        app_name = None
+        if handle:
+            try:
+                size = wintypes.DWORD(1024)
+                exe_buffer = ctypes.create_unicode_buffer(size.value)
+                if kernel32.QueryFullProcessImageNameW(
+                    handle, 0, exe_buffer, ctypes.byref(size)
+                ):
+                    app_name = exe_buffer.value.split("\\")[-1]
+            finally:
+                kernel32.CloseHandle(handle)
+
+        qt_rect = QtCore.QRect(rect.left, rect.top, width, height) if placeable else QtCore.QRect()
+        windows.append(
+            WindowInfo(
+                window_id=str(hwnd),
+                title=title,
+                app_name=app_name,
+                rect=qt_rect,
+                placeable=placeable,
+            )
+        )
+        return True
+
+    user32.EnumWindows(EnumWindowsProc(enum_callback), 0)
+    return windows
+
+
+def _list_windows_macos() -> list[WindowInfo]:
+    quartz_windows = _list_windows_macos_quartz()
+    if quartz_windows:
+        return quartz_windows
+
+    #  Apps without a window still get one line (empty id) so they count for detection
+    script = (
+        'tell application "System Events"\n'
+        "set appList to application processes whose visible is true\n"
+        'set output to ""\n'
+        "repeat with proc in appList\n"
+        "set appName to name of proc\n"
+        "set procWindows to {}\n"
+        "try\n"
+        "set procWindows to windows of proc\n"
+        "end try\n"
+        "if (count of procWindows) is 0 then\n"
+        'set output to output & "||" & appName & "||" & "" & "||" & "" & "\\n"\n'
+        "end if\n"
+        "repeat with w in procWindows\n"
+        "set windowName to name of w\n"
+        "set windowId to id of w\n"
+        "set winPos to position of w\n"
+        "set winSize to size of w\n"
+        'set output to output & windowId & "||" & appName & "||" & windowName & '
+        '"||" & item 1 of winPos & "," & item 2 of winPos & "," & '
+        'item 1 of winSize & "," & item 2 of winSize & "\\n"\n'
+        "end repeat\n"
+        "end repeat\n"
+        "return output\n"
+        "end tell"
+    )
+    result = _run_command(["osascript", "-e", script])
+    if not result:
+        return []
+    windows: list[WindowInfo] = []
+    for line in result.splitlines():
+        parts = line.split("||")
+        if len(parts) != 4:
+            continue
+        window_id, app_name, title, rect_csv = parts
+        rect = None
+        rect_parts = rect_csv.split(",")
+        if len(rect_parts) == 4:
+            try:
+                x, y, width, height = (int(val) for val in rect_parts)
+            except ValueError:
+                width = height = 0
+            if width > 0 and height > 0:
+                rect = QtCore.QRect(x, y, width, height)
+        windows.append(
+            WindowInfo(
+                window_id=str(window_id) or f"app:{app_name}",
+                title=title,
+                app_name=app_name or None,
+                rect=rect if rect is not None else QtCore.QRect(),
+                placeable=bool(window_id) and rect is not None,
+            )
+        )
+    return windows
+
+
+def _list_windows_macos_quartz() -> list[WindowInfo]:
+    try:
+        import Quartz  # type: ignore
+    except Exception:
+        return []
+
+    #  Off-screen (minimized, hidden) windows are listed too, but not placeable
+    options = Quartz.kCGWindowListOptionAll | Quartz.kCGWindowListExcludeDesktopElements
+    window_list = Quartz.CGWindowListCopyWindowInfo(options, Quartz.kCGNullWindowID)
+    if not window_list:
+        return []
+
+    windows: list[WindowInfo] = []
+    for window in window_list:
+        if window.get("kCGWindowLayer", 0) != 0:
+            #  Menu bar items, the dock and other non-document windows
+            continue
+        window_id = window.get("kCGWindowNumber")
+        if window_id is None:
+            continue
+        bounds = window.get("kCGWindowBounds") or {}
+        width = int(bounds.get("Width", 0))
+        height = int(bounds.get("Height", 0))
+        placeable = bool(window.get("kCGWindowIsOnscreen")) and width > 0 and height > 0
+        title = window.get("kCGWindowName") or ""
+        app_name = window.get("kCGWindowOwnerName") or None
+        rect = _qt_rect_from_cg_bounds(bounds, width, height) if placeable else QtCore.QRect()
+        windows.append(
+            WindowInfo(
+                window_id=str(window_id),
+                title=title,
+                app_name=app_name,
+                rect=rect,
+                placeable=placeable,
+            )
+        )
+    windows.extend(_list_windowless_apps_macos({window.app_name for window in windows}))
+    return windows
+
+
+def _list_windowless_apps_macos(seen_apps: set[Optional[str]]) -> list[WindowInfo]:
+    """Visible apps that have no window at all; they still count for slack detection."""
+    try:
+        import AppKit  # type: ignore
+    except Exception:
+        return []
+    apps: list[WindowInfo] = []
+    for app in AppKit.NSWorkspace.sharedWorkspace().runningApplications():
+        if app.activationPolicy() != AppKit.NSApplicationActivationPolicyRegular or app.isHidden():
+            continue
+        app_name = app.localizedName()
+        if not app_name or app_name in seen_apps:
+            continue
+        apps.append(
+            WindowInfo(
+                window_id=f"app:{app.processIdentifier()}",
+                title="",
+                app_name=app_name,
+                rect=QtCore.QRect(),
+                placeable=False,
+            )
+        )
+    return apps
+
+
+def _qt_rect_from_cg_bounds(
+    bounds: dict,
+    width: int,
+    height: int,
+) -> QtCore.QRect:
+    x = int(bounds.get("X", 0))
+    y = int(bounds.get("Y", 0))
+    y = _macos_flip_y(y, height)
+    return QtCore.QRect(x, y, width, height)
+
+
+def _macos_flip_y(y: int, height: int) -> int:
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        return y
+    screen = app.primaryScreen()
+    if screen is None:
+        return y
+    geo = screen.geometry()
+    return geo.y() + geo.height() - (y + height)
+
+
+def _list_windows_linux() -> list[WindowInfo]:
+    clients = query_client_windows(with_geometry=True)
+    if clients is not None:
+        return [
+            WindowInfo(
+                window_id=window_id,
+                title=title or "",
+                app_name=app_name,
+                rect=QtCore.QRect(*geometry) if geometry is not None else QtCore.QRect(),
+                placeable=bool(title) and geometry is not None,
+            )
+            for window_id, app_name, title, geometry in clients
+        ]
+    root_output = _run_command(["xprop", "-root", "_NET_CLIENT_LIST"])
+    if not root_output:
+        return []
+    ids = re.findall(r"0x[0-9a-fA-F]+", root_output)
+    windows: list[WindowInfo] = []
+    for window_id in ids:
+        title = _parse_xprop_value(
+            _run_command(["xprop", "-id", window_id, "_NET_WM_NAME"])
+        )
+        if title is None:
+            title = _parse_xprop_value(
+                _run_command(["xprop", "-id", window_id, "WM_NAME"])
+            )
+        app_name = _parse_xprop_value(
+            _run_command(["xprop", "-id", window_id, "WM_CLASS"]),
+            prefer_last=True,
+        )
+        rect = _xwininfo_rect(window_id) if title else None
+        windows.append(
+            WindowInfo(
+                window_id=window_id.lower(),
+                title=title or "",
+                app_name=app_name,
+                rect=rect if rect is not None else QtCore.QRect(),
+                placeable=rect is not None,
+            )
+        )
+    return windows
+
+
+def _xwininfo_rect(window_id: str) -> Optional[QtCore.QRect]:
+    if get_x11_connection() is not None:
+        geometry = query_window_geometry(window_id)
+        return QtCore.QRect(*geometry) if geometry is not None else None
+    output = _run_command(["xwininfo", "-id", window_id])
+    if not output:
+        return None
+    x_match = re.search(r"Absolute upper-left X:\s+(-?\d+)", output)
+    y_match = re.search(r"Absolute upper-left Y:\s+(-?\d+)", output)
+    w_match = re.search(r"Width:\s+(\d+)", output)
+    h_match = re.search(r"Height:\s+(\d+)", output)
+    if not (x_match and y_match and w_match and h_match):
+        return None
+    x = int(x_match.group(1))
+    y = int(y_match.group(1))
+    width = int(w_match.group(1))
+    height = int(h_match.group(1))
+    if width <= 0 or height <= 0:
+        return None
+    return QtCore.QRect(x, y, width, height)